@@ -5,20 +5,26 @@ from __future__ import annotations
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     DOMAIN,
     PLATFORMS,
 )
-from .coordinator import TrueNASCoordinator
+from .coordinator import TrueNASCoordinator, capabilities_store
+from .services import async_setup_services
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 
 # ---------------------------
-#   update_listener
+#   async_setup
 # ---------------------------
-async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry):
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up TrueNAS services."""
+    async_setup_services(hass)
+    return True
 
 
 # ---------------------------
@@ -38,8 +44,12 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 #   async_reload_entry
 # ---------------------------
 async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Reload the config entry when it changed."""
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    """Apply entry changes, reloading only when the connection changed."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    if coordinator.needs_reload():
+        await hass.config_entries.async_reload(config_entry.entry_id)
+    else:
+        await coordinator.async_apply_options()
 
 
 # ---------------------------
@@ -54,3 +64,11 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         hass.data[DOMAIN].pop(config_entry.entry_id)
 
     return unload_ok
+
+
+# ---------------------------
+#   async_remove_entry
+# ---------------------------
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove stored data of a deleted config entry."""
+    await capabilities_store(hass, config_entry.entry_id).async_remove()
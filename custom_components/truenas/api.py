@@ -1,15 +1,274 @@
 """TrueNAS API."""
 
+from contextlib import contextmanager
+from heapq import heappop, heappush
+from itertools import count
 from logging import getLogger
-from threading import Lock
-from typing import Any
-
+from threading import Condition, Lock
+from time import monotonic
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import errno
+import hashlib
+import os
+import selectors
+import socket
 import ssl
 import json
 from websockets.sync.client import connect, ClientConnection
 
 _LOGGER = getLogger(__name__)
 
+DNS_CACHE_TTL = 300
+CONNECT_TIMEOUT = 10
+CONNECT_ATTEMPT_DELAY = 0.25
+# Seconds events are read at a time before checking for queued requests
+EVENT_READ_SLICE = 0.1
+
+# Seconds to serve responses of rarely changing methods from memory, only for
+# methods whose volatile fields are corrected or fetched elsewhere
+CACHE_TTL = {
+    "system.info": 3600,
+    "disk.query": 600,
+}
+
+PRIORITY_ACTION = 0
+PRIORITY_POLL = 1
+PRIORITY_EVENTS = 2
+LANES = {
+    PRIORITY_ACTION: "action",
+    PRIORITY_POLL: "poll",
+    PRIORITY_EVENTS: "events",
+}
+
+_dns_cache: dict[tuple[str, int], tuple[float, list]] = {}
+
+
+# ---------------------------
+#   TrueNASError
+# ---------------------------
+class TrueNASError(Exception):
+    """Base error of TrueNAS API calls."""
+
+
+# ---------------------------
+#   TrueNASConnectionError
+# ---------------------------
+class TrueNASConnectionError(TrueNASError):
+    """Connection to TrueNAS failed or was lost."""
+
+
+# ---------------------------
+#   TrueNASMethodError
+# ---------------------------
+class TrueNASMethodError(TrueNASError):
+    """TrueNAS returned an error for a method call."""
+
+    def __init__(self, reason: str, message: str, data: dict) -> None:
+        """Initialize the error with the raw and decoded response."""
+        super().__init__(reason)
+        self.message = message
+        self.data = data
+
+
+_dns_lock = Lock()
+
+
+# ---------------------------
+#   resolve
+# ---------------------------
+def resolve(host: str, port: int) -> list:
+    """Resolve host, reusing cached addresses until they expire."""
+    now = monotonic()
+    with _dns_lock:
+        cached = _dns_cache.get((host, port))
+        if cached and cached[0] > now:
+            return cached[1]
+
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+
+    # Interleave address families, preferred family first (RFC 8305)
+    families = {}
+    for info in infos:
+        families.setdefault(info[0], []).append(info)
+
+    addrs = []
+    while any(families.values()):
+        for family_infos in families.values():
+            if family_infos:
+                addrs.append(family_infos.pop(0))
+
+    with _dns_lock:
+        _dns_cache[(host, port)] = (now + DNS_CACHE_TTL, addrs)
+
+    return addrs
+
+
+# ---------------------------
+#   forget_resolved
+# ---------------------------
+def forget_resolved(host: str, port: int) -> None:
+    """Drop cached addresses for host."""
+    with _dns_lock:
+        _dns_cache.pop((host, port), None)
+
+
+# ---------------------------
+#   connect_any
+# ---------------------------
+def connect_any(addrs: list, timeout: float) -> socket.socket:
+    """Race TCP connections to addrs, staggered by CONNECT_ATTEMPT_DELAY."""
+    deadline = monotonic() + timeout
+    queue = list(addrs)
+    pending = {}
+    error = None
+    start_next = True
+    selector = selectors.DefaultSelector()
+    try:
+        while queue or pending:
+            if queue and (start_next or not pending):
+                start_next = False
+                family, sock_type, proto, _, sockaddr = queue.pop(0)
+                sock = socket.socket(family, sock_type, proto)
+                sock.setblocking(False)
+                err = sock.connect_ex(sockaddr)
+                if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    error = OSError(err, os.strerror(err))
+                    sock.close()
+                    start_next = True
+                    continue
+
+                selector.register(sock, selectors.EVENT_WRITE)
+                pending[sock] = sockaddr
+                next_attempt = monotonic() + CONNECT_ATTEMPT_DELAY
+
+            wait = deadline - monotonic()
+            if wait <= 0:
+                break
+
+            if queue:
+                wait = max(0, min(wait, next_attempt - monotonic()))
+
+            events = selector.select(wait)
+            if not events:
+                start_next = True
+                continue
+
+            for key, _ in events:
+                sock = key.fileobj
+                selector.unregister(sock)
+                pending.pop(sock)
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err == 0:
+                    sock.setblocking(True)
+                    return sock
+
+                error = OSError(err, os.strerror(err))
+                sock.close()
+                start_next = True
+    finally:
+        for sock in pending:
+            sock.close()
+
+        selector.close()
+
+    if monotonic() < deadline and error:
+        raise error
+
+    raise TimeoutError("timed out while connecting")
+
+
+# ---------------------------
+#   RequestScheduler
+# ---------------------------
+class RequestScheduler(object):
+    """Hand the connection to waiting requests in priority order."""
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._condition = Condition()
+        self._busy = False
+        self._waiting = []
+        self._sequence = count()
+        self._stats = {
+            lane: {
+                "requests": 0,
+                "wait_total": 0.0,
+                "wait_max": 0.0,
+                "time_total": 0.0,
+                "time_max": 0.0,
+            }
+            for lane in LANES.values()
+        }
+
+    # ---------------------------
+    #   slot
+    # ---------------------------
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_POLL):
+        """Wait until no higher priority request is queued, then hold the connection."""
+        queued = monotonic()
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heappush(self._waiting, ticket)
+            while self._busy or self._waiting[0] != ticket:
+                self._condition.wait()
+
+            heappop(self._waiting)
+            self._busy = True
+
+        started = monotonic()
+        try:
+            yield
+        finally:
+            finished = monotonic()
+            with self._condition:
+                self._busy = False
+                self._record(priority, started - queued, finished - started)
+                self._condition.notify_all()
+
+    # ---------------------------
+    #   queued
+    # ---------------------------
+    def queued(self) -> bool:
+        """Return True if a request is waiting for the connection."""
+        with self._condition:
+            return bool(self._waiting)
+
+    # ---------------------------
+    #   _record
+    # ---------------------------
+    def _record(self, priority: int, wait: float, duration: float) -> None:
+        """Record latency for a lane."""
+        stats = self._stats[LANES[priority]]
+        stats["requests"] += 1
+        stats["wait_total"] += wait
+        stats["wait_max"] = max(stats["wait_max"], wait)
+        stats["time_total"] += duration
+        stats["time_max"] = max(stats["time_max"], duration)
+
+    # ---------------------------
+    #   stats
+    # ---------------------------
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return latency per lane in milliseconds."""
+        ret = {}
+        with self._condition:
+            for lane, stats in self._stats.items():
+                requests = stats["requests"] or 1
+                ret[lane] = {
+                    "requests": stats["requests"],
+                    "queued": sum(1 for tmp in self._waiting if LANES[tmp[0]] == lane),
+                    "wait_avg_ms": round(stats["wait_total"] / requests * 1000, 1),
+                    "wait_max_ms": round(stats["wait_max"] * 1000, 1),
+                    "time_avg_ms": round(stats["time_total"] / requests * 1000, 1),
+                    "time_max_ms": round(stats["time_max"] * 1000, 1),
+                }
+
+        return ret
+
 
 # ---------------------------
 #   TrueNASAPI
@@ -30,6 +289,9 @@ class TrueNASAPI(object):
         self._api_key = api_key
         self._ssl_verify = verify_ssl
         self._url = f"wss://{self._host}/api/current"
+        url = urlsplit(self._url)
+        self._hostname = url.hostname
+        self._port = url.port or 443
         self._ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
         self._ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
         if verify_ssl:
@@ -39,7 +301,13 @@ class TrueNASAPI(object):
             self._ssl_context.check_hostname = False
             self._ssl_context.verify_mode = ssl.CERT_NONE
 
-        self.lock = Lock()
+        self._scheduler = RequestScheduler()
+        # Collection -> [subscription id, number of waiters]
+        self._subscriptions: dict[str, list] = {}
+        self._subscription_lock = Lock()
+        self._event_listeners: dict[str, list[Callable[[dict], None]]] = {}
+        self._fingerprints: dict[tuple[str, str], bytes] = {}
+        self._cache: dict[tuple[str, str], tuple[float, str, Any]] = {}
         self._connected = False
         self._error = ""
         self._error_logged = False
@@ -47,19 +315,29 @@ class TrueNASAPI(object):
     # ---------------------------
     #   connect
     # ---------------------------
-    def connect(self) -> bool:
+    def connect(self, priority: int = PRIORITY_POLL) -> bool:
         """Return connected boolean."""
-        with self.lock:
-            self._connected = False
+        with self._scheduler.slot(priority):
+            # Another worker reconnected while this one waited for the slot
+            if self._connected:
+                return True
+
+            if hasattr(self, "_ws") and self._ws:
+                self._ws.close()
+
             self._error = ""
             try:
+                sock = connect_any(resolve(self._hostname, self._port), CONNECT_TIMEOUT)
                 self._ws = connect(
                     self._url,
+                    sock=sock,
                     ssl=self._ssl_context,
+                    server_hostname=self._hostname,
                     max_size=16777216,
                     ping_interval=20,
                 )
             except Exception as e:
+                forget_resolved(self._hostname, self._port)
                 if "CERTIFICATE_VERIFY_FAILED" in str(e.args):
                     self._error = "certificate_verify_failed"
 
@@ -86,6 +364,9 @@ class TrueNASAPI(object):
                 if "timed out while waiting for handshake response" in e.args:
                     self._error = "handshake_timeout"
 
+                if "timed out while connecting" in e.args:
+                    self._error = "connect_timeout"
+
                 if "404" in str(e):
                     self._error = "api_not_found"
 
@@ -108,6 +389,14 @@ class TrueNASAPI(object):
                 self._connected = data["result"]
                 if not self._connected:
                     self._error = "invalid_key"
+                else:
+                    self._fingerprints.clear()
+                    self._cache.clear()
+                    for collection, subscription in list(self._subscriptions.items()):
+                        _, tmp = self._request("core.subscribe", [collection])
+                        subscription[0] = (
+                            tmp.get("result") if isinstance(tmp, dict) else None
+                        )
 
             except Exception as e:
                 if not self._error_logged:
@@ -158,80 +447,314 @@ class TrueNASAPI(object):
         return self._connected, self._error
 
     # ---------------------------
-    #   query
+    #   _request
     # ---------------------------
-    def query(self, service: str, params: dict[str, Any] | None = {}) -> list | None:
-        """Retrieve data from TrueNAS."""
-        if not self.connected():
-            self.connect()
+    def _request(self, service: str, params: dict[str, Any] | list) -> tuple:
+        """Send a request, dispatch events received until its response arrives."""
+        payload = {
+            "method": service,
+            "jsonrpc": "2.0",
+            "id": 0,
+            "params": [],
+        }
+        if params != {}:
+            if type(params) is not list:
+                params = [params]
+            payload["params"] = params
+
+        self._ws.send(json.dumps(payload))
+        while True:
+            message = self._ws.recv()
+            if not message.startswith("{"):
+                return message, None
+
+            data = json.loads(message)
+            if "id" in data or "method" not in data:
+                return message, data
+
+            self._dispatch_event(data)
 
-        with self.lock:
-            self._error = ""
+    # ---------------------------
+    #   _dispatch_event
+    # ---------------------------
+    def _dispatch_event(self, data: dict) -> None:
+        """Pass a collection update to its listeners."""
+        params = data.get("params") or {}
+        for listener in list(self._event_listeners.get(params.get("collection"), [])):
             try:
-                _LOGGER.debug(
-                    "TrueNAS %s query: %s, %s",
-                    self._host,
-                    service,
-                    params,
-                )
-                payload = {
-                    "method": service,
-                    "jsonrpc": "2.0",
-                    "id": 0,
-                    "params": [],
-                }
-                if params != {}:
-                    if type(params) is not list:
-                        params = [params]
-                    payload["params"] = params
+                listener(params)
+            except Exception as e:
+                _LOGGER.error("TrueNAS %s event listener failed (%s)", self._host, e)
 
-                self._ws.send(json.dumps(payload))
-                message = self._ws.recv()
-                if message.startswith("{"):
-                    data = json.loads(message)
-                    if "result" in data:
-                        data = data["result"]
-                    else:
-                        self._error = "malformed_result"
-
-                    if (type(data) is list or type(data) is dict) and "error" in data:
-                        if (
-                            "data" in data["error"]
-                            and "reason" in data["error"]["data"]
-                        ):
-                            _LOGGER.error(
-                                "TrueNAS %s query (%s) error: %s",
-                                self._host,
-                                service,
-                                data["error"]["data"]["reason"],
-                            )
-                        else:
-                            _LOGGER.error(
-                                "TrueNAS %s query (%s) error: %s",
-                                self._host,
-                                service,
-                                data["error"]["message"],
-                            )
-                else:
-                    data = message
+    # ---------------------------
+    #   add_event_listener
+    # ---------------------------
+    def add_event_listener(
+        self, collection: str, listener: Callable[[dict], None]
+    ) -> Callable[[], None]:
+        """Call listener from the I/O thread for each update of collection."""
+        self._event_listeners.setdefault(collection, []).append(listener)
+
+        def remove_listener() -> None:
+            """Remove event listener."""
+            self._event_listeners[collection].remove(listener)
 
-                _LOGGER.debug(
-                    "TrueNAS %s query (%s) response: %s", self._host, service, data
+        return remove_listener
+
+    # ---------------------------
+    #   subscribe
+    # ---------------------------
+    def subscribe(self, collection: str) -> bool:
+        """Subscribe to collection updates until every waiter unsubscribed."""
+        with self._subscription_lock:
+            # Reconnecting restores active subscriptions
+            if collection in self._subscriptions and (
+                self.connected() or self.connect(PRIORITY_ACTION)
+            ):
+                self._subscriptions[collection][1] += 1
+                return True
+
+            subscription = self.query(
+                "core.subscribe", [collection], priority=PRIORITY_ACTION
+            )
+            if not isinstance(subscription, str):
+                return False
+
+            waiters = self._subscriptions.get(collection, [None, 0])[1]
+            self._subscriptions[collection] = [subscription, waiters + 1]
+            return True
+
+    # ---------------------------
+    #   unsubscribe
+    # ---------------------------
+    def unsubscribe(self, collection: str) -> None:
+        """Release a subscription, drop it when the last waiter is gone."""
+        with self._subscription_lock:
+            if (subscription := self._subscriptions.get(collection)) is None:
+                return
+
+            subscription[1] -= 1
+            if subscription[1] > 0:
+                return
+
+            del self._subscriptions[collection]
+            if subscription[0] and self.connected():
+                self.query(
+                    "core.unsubscribe", [subscription[0]], priority=PRIORITY_ACTION
                 )
+
+    # ---------------------------
+    #   pump_events
+    # ---------------------------
+    def pump_events(self, timeout: float) -> bool:
+        """Dispatch events pushed within timeout seconds, return connected state.
+
+        Reads only while the connection is idle and returns as soon as a
+        request is queued, requests dispatch events arriving meanwhile.
+        """
+        if not self.connected():
+            return False
+
+        with self._scheduler.slot(PRIORITY_EVENTS):
+            deadline = monotonic() + timeout
+            try:
+                while (
+                    remaining := deadline - monotonic()
+                ) > 0 and not self._scheduler.queued():
+                    try:
+                        message = self._ws.recv(
+                            timeout=min(remaining, EVENT_READ_SLICE)
+                        )
+                    except TimeoutError:
+                        continue
+
+                    if message.startswith("{"):
+                        data = json.loads(message)
+                        if "method" in data:
+                            self._dispatch_event(data)
+            except Exception as e:
+                _LOGGER.warning("TrueNAS %s unable to read events (%s)", self._host, e)
+                self.disconnect()
+
+        return self._connected
+
+    # ---------------------------
+    #   query
+    # ---------------------------
+    def query(
+        self,
+        service: str,
+        params: dict[str, Any] | None = {},
+        priority: int = PRIORITY_POLL,
+    ) -> list | None:
+        """Retrieve data from TrueNAS."""
+        return self._query(service, params, priority)[1]
+
+    # ---------------------------
+    #   query_changed
+    # ---------------------------
+    def query_changed(
+        self,
+        service: str,
+        params: dict[str, Any] | None = {},
+        priority: int = PRIORITY_POLL,
+    ) -> tuple[bool, Any]:
+        """Retrieve data from TrueNAS, report if the response differs from last time."""
+        try:
+            return self.call_changed(service, params, priority)
+        except TrueNASMethodError as e:
+            return True, e.data
+        except TrueNASError:
+            return True, None
+
+    # ---------------------------
+    #   call
+    # ---------------------------
+    def call(
+        self,
+        service: str,
+        params: dict[str, Any] | None = {},
+        priority: int = PRIORITY_POLL,
+    ) -> Any:
+        """Call a middleware method, raise TrueNASError on failure."""
+        return self._call(service, params, priority)[1]
+
+    # ---------------------------
+    #   call_changed
+    # ---------------------------
+    def call_changed(
+        self,
+        service: str,
+        params: dict[str, Any] | None = {},
+        priority: int = PRIORITY_POLL,
+    ) -> tuple[bool, Any]:
+        """Call a middleware method, report if the response differs from last time."""
+        key = (service, json.dumps(params))
+        try:
+            message, data = self._call(service, params, priority)
+        except TrueNASError:
+            self._fingerprints.pop(key, None)
+            raise
+
+        fingerprint = hashlib.blake2b(message.encode(), digest_size=16).digest()
+        if self._fingerprints.get(key) == fingerprint:
+            return False, data
+
+        self._fingerprints[key] = fingerprint
+        return True, data
+
+    # ---------------------------
+    #   forget_fingerprints
+    # ---------------------------
+    def forget_fingerprints(self, service: str) -> None:
+        """Treat the next response of service as changed."""
+        for key in [key for key in self._fingerprints if key[0] == service]:
+            del self._fingerprints[key]
+
+    # ---------------------------
+    #   _query
+    # ---------------------------
+    def _query(
+        self,
+        service: str,
+        params: dict[str, Any] | None,
+        priority: int,
+    ) -> tuple[str | None, Any]:
+        """Retrieve data from TrueNAS, return raw message and decoded data."""
+        try:
+            return self._call(service, params, priority)
+        except TrueNASMethodError as e:
+            _LOGGER.error("TrueNAS %s query (%s) error: %s", self._host, service, e)
+            return e.message, e.data
+        except TrueNASConnectionError as e:
+            _LOGGER.warning(
+                'TrueNAS %s unable to fetch data "%s" (%s)',
+                self._host,
+                service,
+                e,
+            )
+            return None, None
+
+    # ---------------------------
+    #   _call
+    # ---------------------------
+    def _call(
+        self,
+        service: str,
+        params: dict[str, Any] | None,
+        priority: int,
+    ) -> tuple[str, Any]:
+        """Call a middleware method, return raw message and decoded result."""
+        cacheable = service in CACHE_TTL
+        cache_key = (service, json.dumps(params))
+        if cacheable and (cached := self._cache.get(cache_key)):
+            if monotonic() - cached[0] < CACHE_TTL[service]:
+                return cached[1], cached[2]
+
+        if not self.connected() and not self.connect(priority):
+            raise TrueNASConnectionError(self._error or "not connected")
+
+        with self._scheduler.slot(priority):
+            self._error = ""
+            _LOGGER.debug(
+                "TrueNAS %s query: %s, %s",
+                self._host,
+                service,
+                params,
+            )
+            try:
+                message, data = self._request(service, params)
             except Exception as e:
-                _LOGGER.warning(
-                    'TrueNAS %s unable to fetch data "%s" (%s)',
-                    self._host,
-                    service,
-                    e,
-                )
                 self.disconnect()
                 self._error = str(e)
-                return None
+                raise TrueNASConnectionError(str(e)) from e
+
+            if data is None:
+                data = message
+            elif "error" in data:
+                error = data["error"]
+                if isinstance(error.get("data"), dict) and "reason" in error["data"]:
+                    raise TrueNASMethodError(error["data"]["reason"], message, data)
+
+                raise TrueNASMethodError(error.get("message"), message, data)
+            elif "result" in data:
+                data = data["result"]
+            else:
+                self._error = "malformed_result"
+                raise TrueNASMethodError("malformed_result", message, data)
+
+            _LOGGER.debug(
+                "TrueNAS %s query (%s) response: %s", self._host, service, data
+            )
+            if cacheable:
+                self._cache[cache_key] = (monotonic(), message, data)
+
+            return message, data
 
-            return data
+    # ---------------------------
+    #   cache_age
+    # ---------------------------
+    def cache_age(self, service: str, params: dict[str, Any] | list = {}) -> float:
+        """Return seconds since the cached response of service was fetched."""
+        if (cached := self._cache.get((service, json.dumps(params)))) is None:
+            return 0.0
+
+        return monotonic() - cached[0]
+
+    # ---------------------------
+    #   invalidate_cache
+    # ---------------------------
+    def invalidate_cache(self, service: str | None = None) -> None:
+        """Drop cached responses, all of them if service is None."""
+        for key in [key for key in self._cache if service in (None, key[0])]:
+            del self._cache[key]
 
     @property
     def error(self):
         """Return error."""
         return self._error
+
+    @property
+    def lane_stats(self) -> dict[str, dict[str, Any]]:
+        """Return request latency per priority lane."""
+        return self._scheduler.stats
@@ -1,7 +1,12 @@
 """API parser for JSON APIs."""
 
+from __future__ import annotations
+
+from collections.abc import Iterator, MutableMapping
 from datetime import datetime
 from logging import getLogger
+from sys import intern
+from typing import Any
 
 from pytz import utc
 from voluptuous import Optional
@@ -12,6 +17,116 @@ from .const import TO_REDACT
 
 _LOGGER = getLogger(__name__)
 
+_MISSING = object()
+_RECORD_TYPES: dict[str, type] = {}
+
+
+# ---------------------------
+#   Record
+# ---------------------------
+class Record(MutableMapping):
+    """Dict compatible record storing its known fields in slots."""
+
+    __slots__ = ("_extra",)
+    _name = ""
+    _fields: dict[str, str] = {}
+
+    def __init__(self) -> None:
+        """Initialize an empty record."""
+        self._extra = None
+        for slot in self._fields.values():
+            setattr(self, slot, _MISSING)
+
+    def __getitem__(self, key: str) -> Any:
+        """Return a field."""
+        if (slot := self._fields.get(key)) is not None:
+            value = getattr(self, slot)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set a field, keys outside the spec are kept aside."""
+        if (slot := self._fields.get(key)) is not None:
+            setattr(self, slot, value)
+            return
+
+        if self._extra is None:
+            self._extra = {}
+
+        self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        """Remove a field."""
+        self[key]
+        if (slot := self._fields.get(key)) is not None:
+            setattr(self, slot, _MISSING)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over set fields."""
+        for key, slot in self._fields.items():
+            if getattr(self, slot) is not _MISSING:
+                yield key
+
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        """Return number of set fields."""
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        """Return the record as a dict."""
+        return repr(dict(self))
+
+    def copy(self) -> Record:
+        """Return a shallow copy."""
+        record = object.__new__(type(self))
+        for slot in self._fields.values():
+            setattr(record, slot, getattr(self, slot))
+
+        record._extra = dict(self._extra) if self._extra else None
+        return record
+
+    def __reduce__(self) -> tuple:
+        """Copy and pickle set fields only, the missing marker is not portable."""
+        return _restore_record, (self._name, dict(self))
+
+
+# ---------------------------
+#   _restore_record
+# ---------------------------
+def _restore_record(name: str, fields: dict[str, Any]) -> Record:
+    """Rebuild a copied or unpickled record, unset fields stay missing."""
+    record = record_type(name)()
+    record.update(fields)
+    return record
+
+
+# ---------------------------
+#   record_type
+# ---------------------------
+def record_type(name: str, vals=None, ensure_vals=None) -> type[Record]:
+    """Return the record class for a collection, generated from its specs."""
+    if name not in _RECORD_TYPES:
+        fields = {}
+        for val in (vals or []) + (ensure_vals or []):
+            # Field names need not be identifiers, slots are numbered
+            fields.setdefault(val["name"], f"_f{len(fields)}")
+
+        _RECORD_TYPES[name] = type(
+            f"{name.title()}Record",
+            (Record,),
+            {"__slots__": tuple(fields.values()), "_name": name, "_fields": fields},
+        )
+
+    return _RECORD_TYPES[name]
+
 
 # ---------------------------
 #   utc_from_timestamp
@@ -94,6 +209,7 @@ def parse_api(
     ensure_vals=None,
     only=None,
     skip=None,
+    record=None,
 ) -> dict:
     """Get data from API."""
     debug = _LOGGER.getEffectiveLevel() == 10
@@ -124,7 +240,7 @@ def parse_api(
                 continue
 
             if uid not in data:
-                data[uid] = {}
+                data[uid] = record_type(record, vals, ensure_vals)() if record else {}
 
         if debug:
             _LOGGER.debug("Processing entry %s", async_redact_data(entry, TO_REDACT))
@@ -261,10 +377,15 @@ def fill_vals(data, entry, uid, vals) -> dict:
             if "default_val" in val and val["default_val"] in val:
                 _default = val[val["default_val"]]
 
+            _value = from_entry(entry, _source, default=_default)
+            # Low cardinality values share one object across records
+            if val.get("intern") and isinstance(_value, str):
+                _value = intern(_value)
+
             if uid:
-                data[uid][_name] = from_entry(entry, _source, default=_default)
+                data[uid][_name] = _value
             else:
-                data[_name] = from_entry(entry, _source, default=_default)
+                data[_name] = _value
 
         elif _type == "bool":
             _default = val["default"] if "default" in val else False
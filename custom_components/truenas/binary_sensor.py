@@ -66,50 +66,42 @@ class TrueNASVMBinarySensor(TrueNASBinarySensor):
 
     async def start(self, overcommit: bool = False):
         """Start a VM."""  # virt.instance.start
-        tmp_vm = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "virt.instance.get_instance",
-            [self._data["id"]],
-        )
-
-        if "status" not in tmp_vm:
+        status = await self._async_get_state("virt.instance.get_instance", "status")
+        if status is None:
             _LOGGER.error("VM %s (%s) invalid", self._data["name"], self._data["id"])
             return
 
-        if tmp_vm["status"] != "STOPPED":
+        if status != "STOPPED":
             _LOGGER.warning(
                 "VM %s (%s) is not down", self._data["name"], self._data["id"]
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "virt.instance.start",
             [self._data["id"]],
+            status="RUNNING",
+            running=True,
         )
 
     async def stop(self):
         """Stop a VM."""
-        tmp_vm = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "virt.instance.get_instance",
-            [self._data["id"]],
-        )
-
-        if "status" not in tmp_vm:
+        status = await self._async_get_state("virt.instance.get_instance", "status")
+        if status is None:
             _LOGGER.error("VM %s (%s) invalid", self._data["name"], self._data["id"])
             return
 
-        if tmp_vm["status"] != "RUNNING":
+        if status != "RUNNING":
             _LOGGER.warning(
                 "VM %s (%s) is not up", self._data["name"], self._data["id"]
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "virt.instance.stop",
             [self._data["id"], {"timeout": 0, "force": True}],
+            status="STOPPED",
+            running=False,
         )
 
 
@@ -119,124 +111,74 @@ class TrueNASVMBinarySensor(TrueNASBinarySensor):
 class TrueNASServiceBinarySensor(TrueNASBinarySensor):
     """Define a TrueNAS Service Binary Sensor."""
 
-    async def start(self):
-        """Start a Service."""
-        tmp_service = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.get_instance",
-            [self._data["id"]],
-        )
-
-        if "state" not in tmp_service:
+    async def _async_get_service_state(self, running: bool) -> bool:
+        """Check service state before acting on it."""
+        state = await self._async_get_state("service.get_instance")
+        if state is None:
             _LOGGER.error(
                 "Service %s (%s) invalid", self._data["service"], self._data["id"]
             )
-            return
+            return False
 
-        if tmp_service["state"] != "STOPPED":
+        if running and state == "STOPPED":
+            _LOGGER.warning(
+                "Service %s (%s) is not running",
+                self._data["service"],
+                self._data["id"],
+            )
+            return False
+
+        if not running and state != "STOPPED":
             _LOGGER.warning(
                 "Service %s (%s) is not stopped",
                 self._data["service"],
                 self._data["id"],
             )
+            return False
+
+        return True
+
+    async def start(self):
+        """Start a Service."""
+        if not await self._async_get_service_state(running=False):
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "service.start",
             [self._data["service"]],
+            state="RUNNING",
+            running=True,
         )
-
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_record("service", self._uid)
 
     async def stop(self):
         """Stop a Service."""
-        tmp_service = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.get_instance",
-            [self._data["id"]],
-        )
-
-        if "state" not in tmp_service:
-            _LOGGER.error(
-                "Service %s (%s) invalid", self._data["service"], self._data["id"]
-            )
+        if not await self._async_get_service_state(running=True):
             return
 
-        if tmp_service["state"] == "STOPPED":
-            _LOGGER.warning(
-                "Service %s (%s) is not running",
-                self._data["service"],
-                self._data["id"],
-            )
-            return
-
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "service.stop",
             [self._data["service"]],
+            state="STOPPED",
+            running=False,
         )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_record("service", self._uid)
 
     async def restart(self):
         """Restart a Service."""
-        tmp_service = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.get_instance",
-            [self._data["id"]],
-        )
-
-        if "state" not in tmp_service:
-            _LOGGER.error(
-                "Service %s (%s) invalid", self._data["service"], self._data["id"]
-            )
+        if not await self._async_get_service_state(running=True):
             return
 
-        if tmp_service["state"] == "STOPPED":
-            _LOGGER.warning(
-                "Service %s (%s) is not running",
-                self._data["service"],
-                self._data["id"],
-            )
-            return
-
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.restart",
-            [self._data["service"]],
-        )
-
-        await self.coordinator.async_refresh()
+        await self._async_action("service.restart", [self._data["service"]])
+        await self.coordinator.async_refresh_record("service", self._uid)
 
     async def reload(self):
         """Reload a Service."""
-        tmp_service = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.get_instance",
-            [self._data["id"]],
-        )
-
-        if "state" not in tmp_service:
-            _LOGGER.error(
-                "Service %s (%s) invalid", self._data["service"], self._data["id"]
-            )
-            return
-
-        if tmp_service["state"] == "STOPPED":
-            _LOGGER.warning(
-                "Service %s (%s) is not running",
-                self._data["service"],
-                self._data["id"],
-            )
+        if not await self._async_get_service_state(running=True):
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "service.reload",
-            [self._data["service"]],
-        )
-
-        await self.coordinator.async_refresh()
+        await self._async_action("service.reload", [self._data["service"]])
+        await self.coordinator.async_refresh_record("service", self._uid)
 
 
 # ---------------------------
@@ -247,48 +189,40 @@ class TrueNASAppBinarySensor(TrueNASBinarySensor):
 
     async def start(self):
         """Start an App."""
-        tmp_app = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "app.get_instance",
-            [self._data["id"]],
-        )
-
-        if tmp_app is None or "state" not in tmp_app:
+        state = await self._async_get_state("app.get_instance")
+        if state is None:
             _LOGGER.error("App %s (%s) invalid", self._data["name"], self._data["id"])
             return
 
-        if tmp_app["state"] == "RUNNING":
+        if state == "RUNNING":
             _LOGGER.warning(
                 "App %s (%s) is not down", self._data["name"], self._data["id"]
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "app.start",
             [self._data["id"]],
+            state="RUNNING",
+            running=True,
         )
 
     async def stop(self):
         """Stop an App."""
-        tmp_app = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "app.get_instance",
-            [self._data["id"]],
-        )
-
-        if tmp_app is None or "state" not in tmp_app:
+        state = await self._async_get_state("app.get_instance")
+        if state is None:
             _LOGGER.error("App %s (%s) invalid", self._data["name"], self._data["id"])
             return
 
-        if tmp_app["state"] != "RUNNING":
+        if state != "RUNNING":
             _LOGGER.warning(
                 "App %s (%s) is not up", self._data["name"], self._data["id"]
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "app.stop",
             [self._data["id"]],
+            state="STOPPED",
+            running=False,
         )
@@ -0,0 +1,90 @@
+"""Columnar views of large homogeneous collections."""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from heapq import nlargest
+from typing import Any
+
+
+# ---------------------------
+#   as_number
+# ---------------------------
+def as_number(value: Any, number: type = float) -> float | int:
+    """Return value as number, 0 for placeholders like "unknown"."""
+    try:
+        return number(value)
+    except (TypeError, ValueError):
+        return number(0)
+
+
+# ---------------------------
+#   ColumnStore
+# ---------------------------
+class ColumnStore(object):
+    """Array backed numeric columns of a collection, indexed by uid."""
+
+    def __init__(
+        self,
+        records: Mapping[Any, Mapping[str, Any]],
+        columns: tuple[str, ...],
+        groups: tuple[str, ...] = (),
+        typecode: str = "d",
+    ) -> None:
+        """Build columns from records, typecode "q" keeps byte counts exact."""
+        number = int if typecode == "q" else float
+        self.uids = list(records)
+        self.index = {uid: row for row, uid in enumerate(self.uids)}
+        self.columns = {
+            column: array(
+                typecode,
+                (as_number(record.get(column), number) for record in records.values()),
+            )
+            for column in columns
+        }
+        self.groups = {
+            group: [record.get(group) for record in records.values()]
+            for group in groups
+        }
+
+    def __len__(self) -> int:
+        """Return number of rows."""
+        return len(self.uids)
+
+    # ---------------------------
+    #   value
+    # ---------------------------
+    def value(
+        self, uid: Any, column: str, default: float | None = None
+    ) -> float | int | None:
+        """Return the value of column for uid."""
+        if (row := self.index.get(uid)) is None:
+            return default
+
+        return self.columns[column][row]
+
+    # ---------------------------
+    #   sum_by
+    # ---------------------------
+    def sum_by(self, column: str, group: str) -> dict[Any, float | int]:
+        """Return sums of column per value of group."""
+        sums = {}
+        for key, value in zip(self.groups[group], self.columns[column]):
+            sums[key] = sums.get(key, 0) + value
+
+        return sums
+
+    # ---------------------------
+    #   max
+    # ---------------------------
+    def max(self, column: str) -> float | int:
+        """Return the largest value of column."""
+        return max(self.columns[column], default=0)
+
+    # ---------------------------
+    #   top
+    # ---------------------------
+    def top(self, column: str, count: int) -> list[tuple[Any, float | int]]:
+        """Return uids with the largest values of column."""
+        return nlargest(count, zip(self.uids, self.columns[column]), key=lambda x: x[1])
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
+import re
 from logging import getLogger
 from typing import Any
 
@@ -10,25 +11,40 @@ import voluptuous as vol
 
 from homeassistant.config_entries import (
     CONN_CLASS_LOCAL_POLL,
+    ConfigEntry,
     ConfigFlow,
     ConfigFlowResult,
+    OptionsFlow,
 )
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
     CONF_NAME,
+    CONF_SCAN_INTERVAL,
     CONF_VERIFY_SSL,
 )
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import TextSelector, TextSelectorConfig
 
 from .const import (
+    CONF_ACTION_MAX_AGE,
+    CONF_EXCLUDE,
+    CONF_INCLUDE,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    DEFAULT_ACTION_MAX_AGE,
     DEFAULT_DEVICE_NAME,
     DEFAULT_HOST,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_MAX,
+    DEFAULT_SCAN_INTERVAL_MIN,
     DEFAULT_SSL_VERIFY,
     DOMAIN,
+    RECORD_FILTERS,
 )
 from .api import TrueNASAPI
+from .coordinator import async_handoff_api
 
 _LOGGER = getLogger(__name__)
 
@@ -68,6 +84,36 @@ def _reconfigure_schema(truenas_config: Mapping[str, Any]) -> vol.Schema:
     return vol.Schema(base_schema)
 
 
+def _options_schema(options: Mapping[str, Any]) -> vol.Schema:
+    """Generate options schema."""
+    options_schema = {
+        vol.Required(
+            CONF_SCAN_INTERVAL,
+            default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+        vol.Required(
+            CONF_SCAN_INTERVAL_MIN,
+            default=options.get(CONF_SCAN_INTERVAL_MIN, DEFAULT_SCAN_INTERVAL_MIN),
+        ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+        vol.Required(
+            CONF_SCAN_INTERVAL_MAX,
+            default=options.get(CONF_SCAN_INTERVAL_MAX, DEFAULT_SCAN_INTERVAL_MAX),
+        ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+        vol.Required(
+            CONF_ACTION_MAX_AGE,
+            default=options.get(CONF_ACTION_MAX_AGE, DEFAULT_ACTION_MAX_AGE),
+        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+    for path in RECORD_FILTERS:
+        for option in (CONF_INCLUDE, CONF_EXCLUDE):
+            key = f"{path}_{option}"
+            options_schema[vol.Optional(key, default=options.get(key, []))] = (
+                TextSelector(TextSelectorConfig(multiple=True))
+            )
+
+    return vol.Schema(options_schema)
+
+
 # ---------------------------
 #   configured_instances
 # ---------------------------
@@ -92,6 +138,12 @@ class TrueNASConfigFlow(ConfigFlow, domain=DOMAIN):
         """Initialize the config flow."""
         self.truenas_config: dict[str, Any] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> TrueNASOptionsFlow:
+        """Get the options flow for this handler."""
+        return TrueNASOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -124,6 +176,7 @@ class TrueNASConfigFlow(ConfigFlow, domain=DOMAIN):
 
             # Save instance
             if not errors:
+                async_handoff_api(self.hass, truenas_config, api)
                 return self.async_create_entry(
                     title=truenas_config[CONF_NAME], data=truenas_config
                 )
@@ -162,6 +215,7 @@ class TrueNASConfigFlow(ConfigFlow, domain=DOMAIN):
 
             # Save instance
             if not errors:
+                async_handoff_api(self.hass, truenas_config, api)
                 return self.async_update_reload_and_abort(
                     self._get_reconfigure_entry(),
                     title=reconfigure_entry.data[CONF_NAME],
@@ -173,3 +227,42 @@ class TrueNASConfigFlow(ConfigFlow, domain=DOMAIN):
             data_schema=_reconfigure_schema(reconfigure_entry.data),
             errors=errors,
         )
+
+
+# ---------------------------
+#   TrueNASOptionsFlow
+# ---------------------------
+class TrueNASOptionsFlow(OptionsFlow):
+    """TrueNASOptionsFlow class."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_SCAN_INTERVAL_MIN] > user_input[CONF_SCAN_INTERVAL_MAX]:
+                errors[CONF_SCAN_INTERVAL_MIN] = "interval_range"
+
+            for key, patterns in user_input.items():
+                if not isinstance(patterns, list):
+                    continue
+
+                for pattern in patterns:
+                    if not pattern.startswith("re:"):
+                        continue
+
+                    try:
+                        re.compile(pattern[3:])
+                    except re.error:
+                        errors[key] = "invalid_pattern"
+
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_options_schema(user_input or self.config_entry.options),
+            errors=errors,
+        )
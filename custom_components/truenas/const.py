@@ -21,6 +21,54 @@ DEFAULT_USERNAME = "admin"
 DEFAULT_DEVICE_NAME = "TrueNAS"
 DEFAULT_SSL_VERIFY = False
 
+CONF_ACTION_MAX_AGE = "action_max_age"
+DEFAULT_ACTION_MAX_AGE = 60
+
+STORAGE_VERSION = 1
+
+# Seconds a connection validated by the config flow waits for its entry
+HANDOFF_TIMEOUT = 60
+
+CONF_INCLUDE = "include"
+CONF_EXCLUDE = "exclude"
+# Collections with include/exclude options, with the field patterns match against
+RECORD_FILTERS = {
+    "dataset": "name",
+    "disk": "name",
+    "interface": "name",
+    "app": "name",
+    "snapshottask": "dataset",
+}
+
+DEFAULT_SCAN_INTERVAL = 60
+CONF_SCAN_INTERVAL_MIN = "scan_interval_min"
+DEFAULT_SCAN_INTERVAL_MIN = 30
+CONF_SCAN_INTERVAL_MAX = "scan_interval_max"
+DEFAULT_SCAN_INTERVAL_MAX = 300
+# Blocking TrueNAS calls running at once across all entries
+MAX_CONCURRENT_IO = 3
+# Worker threads of each entry, enough to queue actions ahead of polls
+IO_WORKERS = 4
+# Upper bound of the gap between poll cycles of different entries
+POLL_STAGGER_MAX = 10
+# Polling may keep the middleware busy for at most 1/POLL_LOAD_FACTOR of the time
+POLL_LOAD_FACTOR = 10
+POLL_EMA_WEIGHT = 0.3
+
+JOB_FINISHED_STATES = ("SUCCESS", "FAILED", "ABORTED")
+JOB_POLL_INTERVAL = 2
+JOB_EVENT_WAIT = 1
+JOB_TIMEOUT = 300
+JOB_BURST_INTERVAL = 3
+JOB_RETRIES = 2
+JOB_RETRY_DELAY = 2
+UPDATE_TIMEOUT = 3600
+# Seconds a graph the NAS failed to provide is skipped before trying it again
+GRAPH_RETRY_INTERVAL = 3600
+
+SNAPSHOT_PREFIX = "custom-"
+SNAPSHOT_DELETE_BATCH = 100
+
 TO_REDACT = {
     "username",
     "password",
@@ -36,8 +84,16 @@ TO_REDACT = {
     "key",
 }
 
+SERVICE_JOB_WAIT = "wait"
+SERVICE_JOB_TIMEOUT = "timeout"
+
 SERVICE_CLOUDSYNC_RUN = "cloudsync_run"
-SCHEMA_SERVICE_CLOUDSYNC_RUN = {}
+SCHEMA_SERVICE_CLOUDSYNC_RUN = {
+    vol.Optional(SERVICE_JOB_WAIT, default=False): cv.boolean,
+    vol.Optional(SERVICE_JOB_TIMEOUT, default=JOB_TIMEOUT): vol.All(
+        vol.Coerce(int), vol.Range(min=1)
+    ),
+}
 
 SERVICE_CLOUDSYNC_ABORT = "cloudsync_abort"
 SCHEMA_SERVICE_CLOUDSYNC_ABORT = {}
@@ -70,3 +126,17 @@ SERVICE_APP_START = "app_start"
 SCHEMA_SERVICE_APP_START = {}
 SERVICE_APP_STOP = "app_stop"
 SCHEMA_SERVICE_APP_STOP = {}
+
+SERVICE_APP_START_MANY = "app_start_many"
+SERVICE_APP_STOP_MANY = "app_stop_many"
+SERVICE_VM_START_MANY = "vm_start_many"
+SERVICE_VM_STOP_MANY = "vm_stop_many"
+SERVICE_SERVICE_START_MANY = "service_start_many"
+SERVICE_SERVICE_STOP_MANY = "service_stop_many"
+SERVICE_SERVICE_RESTART_MANY = "service_restart_many"
+
+SERVICE_SNAPSHOT_DATASETS = "datasets"
+SERVICE_SNAPSHOT_RECURSIVE = "recursive"
+SERVICE_SNAPSHOT_KEEP = "keep"
+SERVICE_DATASET_SNAPSHOT_MANY = "dataset_snapshot_many"
+SERVICE_DATASET_SNAPSHOT_PRUNE = "dataset_snapshot_prune"
@@ -2,27 +2,176 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import random
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
+from threading import local
+from time import monotonic
+from collections.abc import Mapping
+from typing import Any, Awaitable, Callable
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from homeassistant.const import (
     CONF_API_KEY,
     CONF_HOST,
     CONF_NAME,
+    CONF_SCAN_INTERVAL,
     CONF_VERIFY_SSL,
 )
 
-from .api import TrueNASAPI
-from .apiparser import parse_api, utc_from_timestamp
-from .const import DOMAIN
+from .api import (
+    PRIORITY_ACTION,
+    PRIORITY_POLL,
+    TrueNASAPI,
+    TrueNASConnectionError,
+    TrueNASError,
+    TrueNASMethodError,
+)
+from .apiparser import from_entry, parse_api, utc_from_timestamp
+from .columns import ColumnStore
+from .helper import match_patterns, record_filters
+from .scheduler import async_get_scheduler
+from .const import (
+    CONF_ACTION_MAX_AGE,
+    CONF_EXCLUDE,
+    CONF_INCLUDE,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    DEFAULT_ACTION_MAX_AGE,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL_MAX,
+    DEFAULT_SCAN_INTERVAL_MIN,
+    DOMAIN,
+    GRAPH_RETRY_INTERVAL,
+    HANDOFF_TIMEOUT,
+    IO_WORKERS,
+    JOB_BURST_INTERVAL,
+    JOB_EVENT_WAIT,
+    JOB_FINISHED_STATES,
+    JOB_POLL_INTERVAL,
+    JOB_RETRIES,
+    JOB_RETRY_DELAY,
+    JOB_TIMEOUT,
+    POLL_EMA_WEIGHT,
+    POLL_LOAD_FACTOR,
+    RECORD_FILTERS,
+    STORAGE_VERSION,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Read-only methods whose concurrent identical calls can share one request
+COALESCED_METHODS = (".query", ".get_instance", ".get_jobs", ".get_state", ".info")
+
+# Version dependent methods, with the first version providing them as a fallback
+# when core.get_methods can not be used
+CAPABILITY_METHODS = {
+    "virt.instance.query": (25, 4),
+    "app.query": (24, 10),
+    "reporting.netdata_get_data": (24, 4),
+    "disk.temperatures": (0, 0),
+    "update.check_available": (0, 0),
+}
+
+# Collections narrowed to records with enabled entities, with their id field
+DEMAND_FILTERS = {
+    "dataset": "id",
+    "disk": "identifier",
+}
+
+# Poll jobs the first refresh waits for, the rest load in the background
+STARTUP_JOBS = ("get_service", "get_pool")
+
+# Matches pool root datasets, which dataset filters never drop
+ROOT_DATASET = ["name", "rnin", "/"]
+
+# Query options per collection
+QUERY_OPTIONS = {
+    "dataset": {"extra": {"retrieve_children": False}},
+}
+
+
+# ---------------------------
+#   capabilities_store
+# ---------------------------
+def capabilities_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding probed capabilities of an entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.capabilities")
+
+
+# ---------------------------
+#   handoff_key
+# ---------------------------
+def handoff_key(data: Mapping[str, Any]) -> tuple:
+    """Return the key of a handed off connection for entry data."""
+    return (data[CONF_HOST], data[CONF_API_KEY], data[CONF_VERIFY_SSL])
+
+
+# ---------------------------
+#   async_handoff_api
+# ---------------------------
+@callback
+def async_handoff_api(
+    hass: HomeAssistant, data: Mapping[str, Any], api: TrueNASAPI
+) -> None:
+    """Keep a connection validated by the config flow for the entry setup."""
+    handoffs = hass.data.setdefault(f"{DOMAIN}_handoff", {})
+    key = handoff_key(data)
+
+    @callback
+    def async_discard(_now: datetime | None = None) -> None:
+        """Close a connection no entry picked up."""
+        if handoffs.get(key, (None,))[0] is api:
+            handoffs.pop(key)[1]()
+            hass.async_add_executor_job(api.disconnect)
+
+    if key in handoffs:
+        previous, cancel = handoffs.pop(key)
+        cancel()
+        hass.async_add_executor_job(previous.disconnect)
+
+    handoffs[key] = (
+        api,
+        async_call_later(hass, HANDOFF_TIMEOUT, async_discard),
+    )
+
+
+# ---------------------------
+#   async_take_api
+# ---------------------------
+@callback
+def async_take_api(hass: HomeAssistant, data: Mapping[str, Any]) -> TrueNASAPI | None:
+    """Return the connection handed off by the config flow, if any."""
+    handoffs = hass.data.get(f"{DOMAIN}_handoff", {})
+    if (handoff := handoffs.pop(handoff_key(data), None)) is None:
+        return None
+
+    handoff[1]()
+    return handoff[0]
+
+
+# ---------------------------
+#   ema
+# ---------------------------
+def ema(previous: float | None, value: float) -> float:
+    """Return exponential moving average."""
+    if previous is None:
+        return value
+
+    return previous + POLL_EMA_WEIGHT * (value - previous)
+
 
 # ---------------------------
 #   TrueNASControllerData
@@ -39,11 +188,16 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
             self.hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=60),
+            update_interval=timedelta(
+                seconds=config_entry.options.get(
+                    CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+                )
+            ),
         )
 
         self.name = config_entry.data[CONF_NAME]
         self.host = config_entry.data[CONF_HOST]
+        self._connection_data = self._get_connection_data()
 
         self.ds = {
             "interface": {},
@@ -59,20 +213,75 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
             "app": {},
         }
 
-        self.api = TrueNASAPI(
+        self.api = async_take_api(hass, config_entry.data) or TrueNASAPI(
             config_entry.data[CONF_HOST],
             config_entry.data[CONF_API_KEY],
             config_entry.data[CONF_VERIFY_SSL],
         )
 
-        self._systemstats_errored = []
+        self._capabilities_store = capabilities_store(hass, config_entry.entry_id)
+        self._capabilities: dict[str, Any] | None = None
         self.datasets_hass_device_id = None
         self.last_updatecheck_update = datetime(1970, 1, 1)
 
         self._is_virtual = False
+        self._version = None
         self._version_major = 0
         self._version_minor = 0
 
+        self._fetched: dict[Any, float] = {}
+        self._unchanged_paths: set[str] = set()
+        self._cycle_unchanged: set[str] = set()
+        self._cycle_queried: set[str] = set()
+        self._job_latency: dict[str, float] = {}
+        self._cycle_latency: float | None = None
+        self._change_rate: float | None = None
+        self._stale: dict[str, float] = {}
+        self._invalidated: dict[tuple[str, Any], float] = {}
+        self._record_listeners: dict[tuple[str, Any], list[Callable[[], None]]] = {}
+        self._coalesced: dict[tuple, dict[str, Any]] = {}
+        self._burst_unsub: CALLBACK_TYPE | None = None
+        self._event_waiters = 0
+        self._event_reader: asyncio.Task | None = None
+        self._consumers: dict[str, dict[Any, dict[str, bool]]] = {}
+        self._consumer_ids: dict[str, tuple[str, Any]] = {}
+        self._excluded: dict[str, list] = {}
+        self._excluded_dirty: set[str] = set()
+        # Graph -> monotonic time it is retried, reporting may just not be ready
+        self._graphs_failed: dict[str, float] = {}
+        self._staged: list[tuple[Callable[[], None], tuple]] | None = None
+        self._write_lock = asyncio.Lock()
+        self._writer = local()
+        self.columns: dict[str, ColumnStore] = {}
+        self.scheduler = async_get_scheduler(hass)
+        self._executor = ThreadPoolExecutor(
+            max_workers=IO_WORKERS,
+            thread_name_prefix=f"{DOMAIN}_{config_entry.data[CONF_NAME]}",
+        )
+        config_entry.async_on_unload(
+            partial(self._executor.shutdown, wait=False, cancel_futures=True)
+        )
+        config_entry.async_on_unload(
+            self.scheduler.async_register(config_entry.entry_id)
+        )
+        self._known_records: dict[str, set] = {}
+        self.signal_new_entities = f"{DOMAIN}_new_entities_{config_entry.entry_id}"
+        self._filters: dict[str, tuple[list, list[str], list[str]]] = {}
+        self._load_filters()
+        config_entry.async_on_unload(
+            hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_registry_updated
+            )
+        )
+        self._record_jobs = {
+            "service": self.get_service,
+            "vm": self.get_vm,
+            "cloudsync": self.get_cloudsync,
+            "replication": self.get_replication,
+            "snapshottask": self.get_snapshottask,
+            "app": self.get_app,
+        }
+
     # ---------------------------
     #   connected
     # ---------------------------
@@ -80,50 +289,1023 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
         """Return connected state."""
         return self.api.connected()
 
+    # ---------------------------
+    #   async_run_io
+    # ---------------------------
+    async def async_run_io(
+        self, func: Callable[..., Any], *args: Any, priority: int = PRIORITY_POLL
+    ) -> Any:
+        """Run blocking TrueNAS I/O on the entry workers, within the shared budget."""
+        async with self.scheduler.slot(self.config_entry.entry_id, priority):
+            return await self.hass.loop.run_in_executor(self._executor, func, *args)
+
+    # ---------------------------
+    #   _async_write
+    # ---------------------------
+    async def _async_write(
+        self, func: Callable[..., Any], *args: Any, priority: int = PRIORITY_POLL
+    ) -> Any:
+        """Run a job on the working buffer, then publish a new generation."""
+        return await self.async_run_io(
+            partial(self._run_write, func, *args), priority=priority
+        )
+
+    # ---------------------------
+    #   _run_write
+    # ---------------------------
+    def _run_write(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a job on a worker, publish and release the write lock if it wrote."""
+        self._writer.locked = False
+        try:
+            result = func(*args)
+        except BaseException:
+            # Drop partial writes of the failed job
+            if self._writer.locked and self.data is not None:
+                self.ds = dict(self.data)
+            raise
+        else:
+            if self._writer.locked:
+                self._publish()
+            return result
+        finally:
+            # Released by the worker, a cancelled caller can not leak the lock
+            if self._writer.locked:
+                self.hass.loop.call_soon_threadsafe(self._write_lock.release)
+            self._writer.locked = None
+
+    # ---------------------------
+    #   _begin_write
+    # ---------------------------
+    def _begin_write(self) -> None:
+        """Hold the write lock from the first write of a job until it is published."""
+        if getattr(self._writer, "locked", None) is False:
+            # Jobs fetch without the lock, only detach, parse and publish wait
+            asyncio.run_coroutine_threadsafe(
+                self._write_lock.acquire(), self.hass.loop
+            ).result()
+            self._writer.locked = True
+
+    # ---------------------------
+    #   _detach
+    # ---------------------------
+    def _detach(self, *paths: str) -> None:
+        """Copy paths still shared with the published data before writing them."""
+        self._begin_write()
+        if self.data is None:
+            return
+
+        for path in paths:
+            if self.ds[path] is self.data.get(path):
+                self.ds[path] = {
+                    key: value.copy() if isinstance(value, Mapping) else value
+                    for key, value in self.ds[path].items()
+                }
+
+    # ---------------------------
+    #   _publish
+    # ---------------------------
+    def _publish(self) -> None:
+        """Swap in the working buffer as the data readers see."""
+        # Paths written since the last swap are private copies, the rest is shared
+        self.data = dict(self.ds)
+
+    # ---------------------------
+    #   async_action
+    # ---------------------------
+    async def async_action(
+        self, service: str, params: dict[str, Any] | list | None = None
+    ) -> Any:
+        """Run an interactive API call ahead of queued polling."""
+        job = partial(
+            self.async_run_io,
+            partial(
+                self.api.query,
+                service,
+                {} if params is None else params,
+                priority=PRIORITY_ACTION,
+            ),
+            priority=PRIORITY_ACTION,
+        )
+        if not service.endswith(COALESCED_METHODS):
+            return await job()
+
+        return await self._async_coalesce(
+            ("action", service, json.dumps(params)), job, join_running=True
+        )
+
+    # ---------------------------
+    #   async_refresh
+    # ---------------------------
+    async def async_refresh(self) -> None:
+        """Refresh data, concurrent callers share one refresh."""
+        await self._async_coalesce(("refresh",), super().async_refresh)
+
+    # ---------------------------
+    #   _async_coalesce
+    # ---------------------------
+    async def _async_coalesce(
+        self, key: tuple, job: Callable[[], Awaitable], join_running: bool = False
+    ) -> Any:
+        """Run job once for all callers with the same key waiting for it.
+
+        Callers share the next run, or the running one too if join_running is set.
+        """
+        if (flight := self._coalesced.get(key)) is None:
+            flight = self._coalesced[key] = {
+                "lock": asyncio.Lock(),
+                "requested": 0,
+                "running": 0,
+                "completed": 0,
+                "result": None,
+                "waiters": 0,
+            }
+
+        flight["waiters"] += 1
+        flight["requested"] += 1
+        ticket = flight["requested"]
+        if join_running and flight["running"] > flight["completed"]:
+            ticket = flight["running"]
+
+        try:
+            async with flight["lock"]:
+                if flight["completed"] < ticket:
+                    flight["running"] = flight["requested"]
+                    try:
+                        flight["result"] = await job()
+                        flight["completed"] = flight["running"]
+                    finally:
+                        flight["running"] = flight["completed"]
+
+                return flight["result"]
+        finally:
+            flight["waiters"] -= 1
+            if not flight["waiters"] and self._coalesced.get(key) is flight:
+                del self._coalesced[key]
+
+    # ---------------------------
+    #   async_wait_job
+    # ---------------------------
+    async def async_wait_job(
+        self,
+        job_id: int,
+        timeout: float = JOB_TIMEOUT,
+        progress_callback: Callable[[dict], None] | None = None,
+    ) -> dict | None:
+        """Wait for a middleware job to finish, return its record or None."""
+        finished = self.hass.loop.create_future()
+
+        @callback
+        def async_job_finished(job: dict) -> None:
+            """Resolve the wait on the event loop."""
+            if not finished.done():
+                finished.set_result(job)
+
+        def job_event(event: dict) -> None:
+            """Handle core.get_jobs events on the I/O thread."""
+            job = event.get("fields") or {}
+            if event.get("id") != job_id:
+                return
+
+            if job.get("state") in JOB_FINISHED_STATES:
+                self.hass.loop.call_soon_threadsafe(async_job_finished, job)
+            elif progress_callback:
+                self.hass.loop.call_soon_threadsafe(progress_callback, job)
+
+        remove_listener = self.api.add_event_listener("core.get_jobs", job_event)
+        subscribed = False
+        try:
+            subscribed = await self.async_run_io(
+                self.api.subscribe, "core.get_jobs", priority=PRIORITY_ACTION
+            )
+            if subscribed:
+                self._event_waiters += 1
+                self._async_start_event_reader()
+
+            deadline = monotonic() + timeout
+            check_state = True
+            while not finished.done():
+                # Events only cover changes after subscribing, check current state once
+                if check_state:
+                    check_state = not subscribed
+                    tmp_job = await self.async_action(
+                        "core.get_jobs", [[["id", "=", job_id]]]
+                    )
+                    if (
+                        isinstance(tmp_job, list)
+                        and tmp_job
+                        and tmp_job[0].get("state") in JOB_FINISHED_STATES
+                    ):
+                        return tmp_job[0]
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return None
+
+                if subscribed:
+                    if not self.api.connected():
+                        return None
+
+                    # Restarts the reader if it stopped for a reconnect
+                    self._async_start_event_reader()
+                    await asyncio.wait(
+                        [finished], timeout=min(JOB_EVENT_WAIT, remaining)
+                    )
+                else:
+                    await asyncio.sleep(min(JOB_POLL_INTERVAL, remaining))
+
+            return finished.result()
+        finally:
+            remove_listener()
+            if subscribed:
+                self._event_waiters -= 1
+                await self.async_run_io(
+                    self.api.unsubscribe, "core.get_jobs", priority=PRIORITY_ACTION
+                )
+
+    # ---------------------------
+    #   _async_start_event_reader
+    # ---------------------------
+    @callback
+    def _async_start_event_reader(self) -> None:
+        """Read pushed events in one task, shared by all job waits."""
+        if self._event_reader is None:
+            self._event_reader = self.config_entry.async_create_background_task(
+                self.hass, self._async_read_events(), f"{DOMAIN} {self.host} events"
+            )
+
+    # ---------------------------
+    #   _async_read_events
+    # ---------------------------
+    async def _async_read_events(self) -> None:
+        """Dispatch events while a job wait is active and the connection is up."""
+        try:
+            # Takes no global I/O slot, pump_events yields to queued requests
+            while self._event_waiters and await self.async_run_io(
+                self.api.pump_events, JOB_EVENT_WAIT, priority=PRIORITY_ACTION
+            ):
+                pass
+        finally:
+            self._event_reader = None
+
+    # ---------------------------
+    #   async_track_consumer
+    # ---------------------------
+    @callback
+    def async_track_consumer(
+        self, path: str, uid: Any, unique_id: str, enabled: bool
+    ) -> None:
+        """Record whether an entity of a record is enabled in the registry."""
+        self._consumers.setdefault(path, {}).setdefault(uid, {})[unique_id] = enabled
+        self._consumer_ids[unique_id] = (path, uid)
+        self._excluded_dirty.add(path)
+
+    # ---------------------------
+    #   _async_registry_updated
+    # ---------------------------
+    @callback
+    def _async_registry_updated(self, event: Event) -> None:
+        """Follow entities being enabled or disabled."""
+        if event.data["action"] != "update" or "disabled_by" not in event.data.get(
+            "changes", {}
+        ):
+            return
+
+        entry = er.async_get(self.hass).async_get(event.data["entity_id"])
+        if entry is None or entry.unique_id not in self._consumer_ids:
+            return
+
+        path, uid = self._consumer_ids[entry.unique_id]
+        self._consumers[path][uid][entry.unique_id] = entry.disabled_by is None
+        self._excluded_dirty.add(path)
+
+    # ---------------------------
+    #   _async_update_excluded
+    # ---------------------------
+    @callback
+    def _async_update_excluded(self) -> None:
+        """Update records nobody has enabled entities for, once per changed path."""
+        for path in self._excluded_dirty & DEMAND_FILTERS.keys():
+            excluded = [
+                uid
+                for uid, consumers in self._consumers[path].items()
+                if not any(consumers.values())
+            ]
+            if path == "dataset":
+                # Pool usage is calculated from the pool root datasets
+                excluded = [uid for uid in excluded if "/" in uid]
+
+            # Replaced, not mutated, as poll jobs read it from the executor
+            self._excluded[path] = sorted(excluded)
+
+        self._excluded_dirty.clear()
+
+    # ---------------------------
+    #   running_jobs
+    # ---------------------------
+    def running_jobs(self) -> dict[int, tuple[str, Any]]:
+        """Return tracked middleware jobs with the record they belong to."""
+        jobs = {}
+        if self.data is None:
+            return jobs
+
+        if self.data["system_info"].get("update_jobid"):
+            jobs[self.data["system_info"]["update_jobid"]] = ("system_info", None)
+
+        for uid, vals in self.data["app"].items():
+            if isinstance(vals.get("update_jobid"), int) and vals["update_jobid"]:
+                jobs[vals["update_jobid"]] = ("app", uid)
+
+        for path in ("cloudsync", "replication"):
+            for uid, vals in self.data[path].items():
+                if vals["state"] == "RUNNING" and vals.get("job_id"):
+                    jobs[vals["job_id"]] = (path, uid)
+
+        return jobs
+
+    # ---------------------------
+    #   async_schedule_burst
+    # ---------------------------
+    @callback
+    def async_schedule_burst(self) -> None:
+        """Poll running jobs every few seconds until they finish."""
+        if self._burst_unsub is None and self.running_jobs():
+            self._burst_unsub = async_call_later(
+                self.hass, JOB_BURST_INTERVAL, self._async_burst_poll
+            )
+
+    # ---------------------------
+    #   _async_burst_poll
+    # ---------------------------
+    async def _async_burst_poll(self, _now: datetime) -> None:
+        """Update progress of running jobs only."""
+        self._burst_unsub = None
+        jobs = self.running_jobs()
+        if not jobs or not self.api.connected():
+            return
+
+        tmp_jobs = await self.async_run_io(
+            self.api.query, "core.get_jobs", [[["id", "in", list(jobs)]]]
+        )
+        finished = []
+        updated = []
+        async with self._write_lock:
+            for job in tmp_jobs if isinstance(tmp_jobs, list) else []:
+                if job.get("id") not in jobs:
+                    continue
+
+                path, uid = jobs[job["id"]]
+                self._detach(path)
+                record = self.ds[path] if uid is None else self.ds[path].get(uid)
+                if record is None:
+                    continue
+
+                state = job.get("state", "unknown")
+                if path == "system_info":
+                    record["update_state"] = state
+                    record["update_progress"] = from_entry(job, "progress/percent", 0)
+                elif path in ("cloudsync", "replication"):
+                    record["state"] = state
+                    record["job_percent"] = from_entry(job, "progress/percent", 0)
+                    record["job_description"] = from_entry(
+                        job, "progress/description", "unknown"
+                    )
+
+                if state in JOB_FINISHED_STATES:
+                    if "update_jobid" in record:
+                        record["update_jobid"] = 0
+
+                    if path != "system_info":
+                        finished.append((path, uid))
+
+                updated.append((path, uid))
+
+            self._publish()
+
+        for path, uid in updated:
+            self.async_update_record_listeners(path, uid)
+
+        # Final job results, e.g. time_finished, come with the record
+        for path, uid in finished:
+            await self.async_refresh_record(path, uid)
+
+        self.async_schedule_burst()
+
+    # ---------------------------
+    #   async_shutdown
+    # ---------------------------
+    async def async_shutdown(self) -> None:
+        """Stop burst polling, the coordinator and the connection."""
+        if self._burst_unsub is not None:
+            self._burst_unsub()
+            self._burst_unsub = None
+
+        await super().async_shutdown()
+        await self.hass.async_add_executor_job(self.api.disconnect)
+
+    # ---------------------------
+    #   async_add_record_listener
+    # ---------------------------
+    @callback
+    def async_add_record_listener(
+        self, path: str, uid: Any | None, update_callback: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for targeted refreshes of a single record."""
+        key = (path, uid)
+        self._record_listeners.setdefault(key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove record listener."""
+            self._record_listeners[key].remove(update_callback)
+            if not self._record_listeners[key]:
+                del self._record_listeners[key]
+
+        return remove_listener
+
+    # ---------------------------
+    #   async_update_record_listeners
+    # ---------------------------
+    @callback
+    def async_update_record_listeners(self, path: str, uid: Any | None = None) -> None:
+        """Notify entities of one record, or of a whole domain if uid is None."""
+        for key, listeners in list(self._record_listeners.items()):
+            if key[0] == path and (uid is None or key[1] == uid):
+                for update_callback in list(listeners):
+                    update_callback()
+
+    # ---------------------------
+    #   async_refresh_record
+    # ---------------------------
+    async def async_refresh_record(self, path: str, uid: Any | None = None) -> None:
+        """Re-query one record, or a whole domain if uid is None."""
+        if path not in self._record_jobs:
+            await self.async_refresh()
+            return
+
+        try:
+            await self._async_coalesce(
+                ("record", path, uid),
+                partial(
+                    self._async_write,
+                    self._record_jobs[path],
+                    uid,
+                    PRIORITY_ACTION,
+                    priority=PRIORITY_ACTION,
+                ),
+            )
+        except TrueNASError as e:
+            _LOGGER.warning("TrueNAS %s unable to refresh %s (%s)", self.host, path, e)
+            return
+
+        self.async_update_record_listeners(path, uid)
+        self.async_schedule_burst()
+
+    # ---------------------------
+    #   async_set_record_values
+    # ---------------------------
+    async def async_set_record_values(
+        self, path: str, uid: Any | None, **values: Any
+    ) -> None:
+        """Write values into a record and publish them, like a poll job would."""
+        async with self._write_lock:
+            self._detach(path)
+            record = self.ds[path] if uid is None else self.ds[path].get(uid)
+            if record is None:
+                return
+
+            record.update(values)
+            self._publish()
+
+        self.async_update_record_listeners(path, uid)
+
+    # ---------------------------
+    #   _query_records
+    # ---------------------------
+    def _query_records(
+        self,
+        path: str,
+        service: str,
+        uid: Any | None = None,
+        priority: int = PRIORITY_POLL,
+    ) -> tuple[bool, list | None]:
+        """Query a collection, or only the record with id uid.
+
+        Returns whether the response changed since the last collection query.
+        """
+        started = monotonic()
+        if uid is None:
+            changed, data = self.api.call_changed(
+                service, self._collection_params(path), priority=priority
+            )
+        else:
+            changed = True
+            data = self.api.call(
+                service,
+                [[["id", "=", uid]], QUERY_OPTIONS.get(path, {})],
+                priority=priority,
+            )
+            # Parsed data no longer matches the last collection response
+            self.api.forget_fingerprints(service)
+
+        data = self._filter_records(path, data)
+
+        if data is not None:
+            self._fetched[path if uid is None else (path, uid)] = started
+
+        if uid is None:
+            self._cycle_queried.add(path)
+
+        if changed:
+            self._cycle_unchanged.discard(path)
+        else:
+            self._cycle_unchanged.add(path)
+
+        return changed, data
+
+    # ---------------------------
+    #   _load_filters
+    # ---------------------------
+    def _load_filters(self) -> None:
+        """Build include/exclude filters from the entry options."""
+        options = self.config_entry.options
+        self._filters = {}
+        for path, field in RECORD_FILTERS.items():
+            include = options.get(f"{path}_{CONF_INCLUDE}", [])
+            exclude = options.get(f"{path}_{CONF_EXCLUDE}", [])
+            if include or exclude:
+                filters = record_filters(field, include, exclude)
+                if path == "dataset":
+                    # Pool usage is calculated from the pool root datasets, keep them
+                    filters = [
+                        ["OR", [*(tmp[1] if tmp[0] == "OR" else [tmp]), ROOT_DATASET]]
+                        for tmp in filters
+                    ]
+
+                self._filters[path] = (filters, include, exclude)
+
+    # ---------------------------
+    #   _collection_params
+    # ---------------------------
+    def _collection_params(self, path: str) -> dict | list:
+        """Return query params with the server-side filters of a collection."""
+        filters = []
+        if excluded := self._excluded.get(path):
+            filters.append([DEMAND_FILTERS[path], "nin", excluded])
+
+        if path in self._filters:
+            filters.extend(self._filters[path][0])
+
+        if path in QUERY_OPTIONS:
+            return [filters, QUERY_OPTIONS[path]]
+
+        return [filters] if filters else {}
+
+    # ---------------------------
+    #   _filter_records
+    # ---------------------------
+    def _filter_records(self, path: str, data: Any) -> Any:
+        """Drop records the server could not filter out."""
+        if path not in self._filters or not isinstance(data, list):
+            return data
+
+        _, include, exclude = self._filters[path]
+        field = RECORD_FILTERS[path]
+        return [
+            entry
+            for entry in data
+            if (path == "dataset" and "/" not in str(entry.get(field, "")))
+            or (
+                (not include or match_patterns(str(entry.get(field, "")), include))
+                and not match_patterns(str(entry.get(field, "")), exclude)
+            )
+        ]
+
+    # ---------------------------
+    #   _get_connection_data
+    # ---------------------------
+    def _get_connection_data(self) -> dict[str, Any]:
+        """Return entry data that can only be applied by reloading the entry."""
+        return {
+            key: self.config_entry.data.get(key)
+            for key in (CONF_NAME, CONF_HOST, CONF_API_KEY, CONF_VERIFY_SSL)
+        }
+
+    # ---------------------------
+    #   needs_reload
+    # ---------------------------
+    def needs_reload(self) -> bool:
+        """Return True if the entry changed in a way options cannot cover."""
+        return self._get_connection_data() != self._connection_data
+
+    # ---------------------------
+    #   async_apply_options
+    # ---------------------------
+    async def async_apply_options(self) -> None:
+        """Apply changed options live."""
+        options = self.config_entry.options
+        self.update_interval = timedelta(
+            seconds=min(
+                max(
+                    options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    options.get(CONF_SCAN_INTERVAL_MIN, DEFAULT_SCAN_INTERVAL_MIN),
+                ),
+                options.get(CONF_SCAN_INTERVAL_MAX, DEFAULT_SCAN_INTERVAL_MAX),
+            )
+        )
+
+        filters = self._filters
+        self._load_filters()
+        changed = [
+            path
+            for path in RECORD_FILTERS
+            if self._filters.get(path) != filters.get(path)
+        ]
+        if not changed:
+            return
+
+        async with self._write_lock:
+            self._detach(*changed)
+            for path in changed:
+                records = self._filter_records(path, list(self.ds[path].values()))
+                kept = {id(record) for record in records}
+                for uid in [
+                    uid for uid in self.ds[path] if id(self.ds[path][uid]) not in kept
+                ]:
+                    _LOGGER.debug("TrueNAS %s %s %s filtered out", self.host, path, uid)
+                    del self.ds[path][uid]
+
+            self._publish()
+
+        # Records brought in by the new filters get their entities on refresh
+        await self.async_refresh()
+
+    # ---------------------------
+    #   data_unchanged
+    # ---------------------------
+    def data_unchanged(self, path: str) -> bool:
+        """Return True if the last poll returned identical data for path."""
+        return path in self._unchanged_paths
+
+    # ---------------------------
+    #   fetched_since
+    # ---------------------------
+    def fetched_since(self, path: str, uid: Any | None, since: float) -> bool:
+        """Return True if the record was queried after since."""
+        return (
+            max(self._fetched.get(path, 0), self._fetched.get((path, uid), 0)) > since
+        )
+
+    # ---------------------------
+    #   get_fresh_record
+    # ---------------------------
+    def get_fresh_record(self, path: str, uid: Any | None) -> dict | None:
+        """Return coordinator data for a record if it is recent enough to act on."""
+        max_age = self.config_entry.options.get(
+            CONF_ACTION_MAX_AGE, DEFAULT_ACTION_MAX_AGE
+        )
+        if max_age <= 0 or self.data is None or uid not in self.data.get(path, {}):
+            return None
+
+        since = max(monotonic() - max_age, self._invalidated.get((path, uid), 0))
+        if not self.fetched_since(path, uid, since):
+            return None
+
+        return self.data[path][uid]
+
+    # ---------------------------
+    #   invalidate_record
+    # ---------------------------
+    def invalidate_record(self, path: str, uid: Any | None) -> float:
+        """Stop trusting cached data for a record, return invalidation time."""
+        self._invalidated[(path, uid)] = monotonic()
+        return self._invalidated[(path, uid)]
+
     # ---------------------------
     #   _async_update_data
     # ---------------------------
     async def _async_update_data(self):
         """Update TrueNAS data."""
-        if not self.api.connected():
-            self.api.connect()
+        # A failing cycle must not leave entities skipping their state write
+        self._unchanged_paths = set()
+        if not self.api.connected() and not await self.async_run_io(self.api.connect):
+            raise UpdateFailed("TrueNas Disconnected")
+
+        if self._capabilities is None:
+            self._capabilities = await self._capabilities_store.async_load() or {
+                "version": None,
+                "methods": {},
+            }
+            # Graph failures are no longer persisted
+            self._capabilities.pop("graphs_failed", None)
+
+        if self._staged is not None:
+            await self.scheduler.async_stagger(
+                self.config_entry.entry_id, self.update_interval.total_seconds()
+            )
+
+        cycle_started = monotonic()
+        stale = set(self._stale)
+        self._cycle_unchanged = set()
+        self._cycle_queried = set()
+        await self._async_run_job(self.get_systeminfo, ("system_info", "interface"))
+        if self._capabilities["version"] != self._version and await self._async_run_job(
+            self.probe_capabilities, ()
+        ):
+            self._capabilities_store.async_delay_save(lambda: self._capabilities)
 
         jobs = [
-            self.get_systeminfo,
-            self.get_systemstats,
-            self.get_service,
-            self.get_disk,
-            self.get_dataset,
-            self.get_pool,
-            self.get_vm,
-            self.get_cloudsync,
-            self.get_replication,
-            self.get_snapshottask,
-            self.get_app,
+            (self.get_service, ("service",), None),
+            # Pool usage is calculated from the datasets of the same cycle
+            (self.get_dataset, ("dataset",), None),
+            (self.get_pool, ("pool",), None),
+            (self.get_systemstats, (), "reporting.netdata_get_data"),
+            (self.get_disk, ("disk",), None),
+            (self.get_vm, ("vm",), "virt.instance.query"),
+            (self.get_cloudsync, ("cloudsync",), None),
+            (self.get_replication, ("replication",), None),
+            (self.get_snapshottask, ("snapshottask",), None),
+            (self.get_app, ("app",), "app.query"),
+            (self.get_updatecheck, (), "update.check_available"),
         ]
+        jobs = [
+            (job, paths)
+            for job, paths, method in jobs
+            if method is None or self.supports(method)
+        ]
+        first_refresh = self._staged is None
+        if first_refresh:
+            # First refresh only waits for the device and core entities
+            self._staged = [job for job in jobs if job[0].__name__ not in STARTUP_JOBS]
+
+        for job, paths in jobs:
+            if (job, paths) in self._staged:
+                continue
+
+            if job == self.get_updatecheck:
+                await self._async_run_updatecheck()
+            else:
+                await self._async_run_job(job, paths)
+
+        # Entities need a state write when their availability changes
+        self._cycle_unchanged -= stale ^ set(self._stale)
+        self._unchanged_paths = (
+            self._cycle_unchanged if self.last_update_success else set()
+        )
+        self._adapt_update_interval(monotonic() - cycle_started)
+        async with self._write_lock:
+            self._publish()
+
+        self.async_schedule_burst()
+        self.async_add_new_entities()
+        if first_refresh:
+            self.config_entry.async_create_background_task(
+                self.hass, self._async_load_stages(), f"{DOMAIN} {self.host} stages"
+            )
 
-        for job in jobs:
-            if self.api.connected():
-                await self.hass.async_add_executor_job(job)
+        return self.data
 
+    # ---------------------------
+    #   _async_run_updatecheck
+    # ---------------------------
+    async def _async_run_updatecheck(self) -> None:
+        """Check for system updates every 12 hours."""
         delta = datetime.now().replace(microsecond=0) - self.last_updatecheck_update
-        if self.api.connected() and delta.total_seconds() > 60 * 60 * 12:
-            await self.hass.async_add_executor_job(self.get_updatecheck)
-            self.last_updatecheck_update = datetime.now().replace(microsecond=0)
+        if delta.total_seconds() > 60 * 60 * 12:
+            if await self._async_run_job(self.get_updatecheck, ()):
+                self.last_updatecheck_update = datetime.now().replace(microsecond=0)
 
-        if not self.api.connected():
-            raise UpdateFailed("TrueNas Disconnected")
+    # ---------------------------
+    #   _async_load_stages
+    # ---------------------------
+    async def _async_load_stages(self) -> None:
+        """Load the inventory after the first refresh, one job at a time."""
+        while self._staged:
+            job, paths = self._staged[0]
+            try:
+                if job == self.get_updatecheck:
+                    await self._async_run_updatecheck()
+                elif await self._async_run_job(job, paths) and job == self.get_dataset:
+                    # Pools were loaded before datasets on the first refresh
+                    await self._async_write(self._process_pool_usage)
+            except UpdateFailed:
+                # Regular polls take over the remaining jobs
+                self._staged.clear()
+                return
+
+            self._staged.pop(0)
+            _LOGGER.debug("TrueNAS %s loaded %s", self.host, job.__name__)
+            self.async_update_listeners()
+            self.async_add_new_entities()
+
+    # ---------------------------
+    #   async_add_new_entities
+    # ---------------------------
+    @callback
+    def async_add_new_entities(self) -> None:
+        """Let platforms add entities for records or system values that appeared."""
+        known = {path: set(records) for path, records in self.data.items()}
+        if any(known[path] - self._known_records.get(path, set()) for path in known):
+            async_dispatcher_send(self.hass, self.signal_new_entities, self)
+
+        self._known_records = known
+
+    # ---------------------------
+    #   _async_run_job
+    # ---------------------------
+    async def _async_run_job(self, job: Callable[[], None], paths: tuple) -> bool:
+        """Run one poll job with bounded retries, mark its data stale on failure."""
+        error = None
+        for attempt in range(JOB_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(
+                    JOB_RETRY_DELAY * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                )
+
+            # A lost connection fails the whole cycle, not just this job
+            if not self.api.connected() and not await self.async_run_io(
+                self.api.connect
+            ):
+                raise UpdateFailed("TrueNas Disconnected")
+
+            self._async_update_excluded()
+            started = monotonic()
+            try:
+                await self._async_write(job)
+            except TrueNASConnectionError as e:
+                error = e
+                _LOGGER.debug("TrueNAS %s %s lost connection", self.host, job.__name__)
+                continue
+            except TrueNASError as e:
+                error = e
+                continue
+            except Exception as e:
+                error = e
+                _LOGGER.exception("TrueNAS %s %s failed", self.host, job.__name__)
+                break
+
+            self._job_latency[job.__name__] = ema(
+                self._job_latency.get(job.__name__), monotonic() - started
+            )
+            for path in paths:
+                self._stale.pop(path, None)
+
+            return True
+
+        _LOGGER.warning(
+            "TrueNAS %s %s failed, keeping last data of %s: %s",
+            self.host,
+            job.__name__,
+            ", ".join(paths) or "none",
+            error,
+        )
+        for path in paths:
+            self._stale.setdefault(path, monotonic())
+
+        return False
+
+    # ---------------------------
+    #   probe_capabilities
+    # ---------------------------
+    def probe_capabilities(self) -> None:
+        """Probe which version dependent methods the running TrueNAS provides."""
+        probed = {}
+        methods = {}
+        for method, version in CAPABILITY_METHODS.items():
+            service = method.rsplit(".", 1)[0]
+            if service not in probed:
+                try:
+                    probed[service] = self.api.call("core.get_methods", [service])
+                except TrueNASMethodError:
+                    probed[service] = None
+
+            if isinstance(probed[service], dict):
+                methods[method] = method in probed[service]
+            else:
+                methods[method] = (self._version_major, self._version_minor) >= version
+
+        _LOGGER.debug(
+            "TrueNAS %s %s capabilities: %s", self.host, self._version, methods
+        )
+        self._capabilities = {
+            "version": self._version,
+            "methods": methods,
+        }
+        self._graphs_failed = {}
+
+    # ---------------------------
+    #   capabilities
+    # ---------------------------
+    @property
+    def capabilities(self) -> dict[str, Any] | None:
+        """Return probed capabilities of the running TrueNAS version."""
+        return self._capabilities
+
+    # ---------------------------
+    #   supports
+    # ---------------------------
+    def supports(self, method: str) -> bool:
+        """Return True unless probing found method missing on this version."""
+        return self._capabilities is None or self._capabilities["methods"].get(
+            method, True
+        )
+
+    # ---------------------------
+    #   is_stale
+    # ---------------------------
+    def is_stale(self, path: str) -> bool:
+        """Return True if the last poll of path failed."""
+        return path in self._stale
+
+    # ---------------------------
+    #   _adapt_update_interval
+    # ---------------------------
+    def _adapt_update_interval(self, cycle_time: float) -> None:
+        """Follow middleware latency and data change rate within configured bounds."""
+        options = self.config_entry.options
+        interval_min = options.get(CONF_SCAN_INTERVAL_MIN, DEFAULT_SCAN_INTERVAL_MIN)
+        interval_max = options.get(CONF_SCAN_INTERVAL_MAX, DEFAULT_SCAN_INTERVAL_MAX)
+
+        self._cycle_latency = ema(self._cycle_latency, cycle_time)
+        if self._cycle_queried:
+            self._change_rate = ema(
+                self._change_rate,
+                len(self._cycle_queried - self._cycle_unchanged)
+                / len(self._cycle_queried),
+            )
+
+        # Poll up to twice as often while everything changes
+        target = options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL) * (
+            1 - (self._change_rate or 0) / 2
+        )
+        # Back off while the middleware is slow, e.g. during scrubs or resilvers
+        target = max(target, self._cycle_latency * POLL_LOAD_FACTOR)
+        target = min(max(target, interval_min), interval_max)
+
+        current = self.update_interval.total_seconds()
+        interval = round(current + (target - current) / 2)
+        if interval != current:
+            _LOGGER.debug(
+                "TrueNAS %s poll interval %ss (cycle %.2fs, change rate %.2f)",
+                self.host,
+                interval,
+                self._cycle_latency,
+                self._change_rate or 0,
+            )
+            self.update_interval = timedelta(seconds=interval)
+
+    # ---------------------------
+    #   poll_stats
+    # ---------------------------
+    @property
+    def poll_stats(self) -> dict[str, Any]:
+        """Return adaptive polling state."""
+        return {
+            "interval": self.update_interval.total_seconds(),
+            "cycle_ms": round((self._cycle_latency or 0) * 1000, 1),
+            "change_rate": round(self._change_rate or 0, 2),
+            "stale": list(self._stale),
+            "job_ms": {
+                job: round(latency * 1000, 1)
+                for job, latency in self._job_latency.items()
+            },
+        }
+
+    # ---------------------------
+    #   aggregates
+    # ---------------------------
+    @property
+    def aggregates(self) -> dict[str, Any]:
+        """Return summaries computed from the columnar stores."""
+        aggregates = {}
+        if datasets := self.columns.get("dataset"):
+            aggregates["pool_used"] = datasets.sum_by("used", "pool")
+            aggregates["top_datasets"] = datasets.top("used", 5)
 
-        return self.ds
+        if disks := self.columns.get("disk"):
+            aggregates["disk_size"] = sum(disks.columns["size"])
+            aggregates["disk_max_temperature"] = disks.max("temperature")
+
+        return aggregates
 
     # ---------------------------
     #   get_systeminfo
     # ---------------------------
     def get_systeminfo(self) -> None:
         """Get system info from TrueNAS."""
+        source = self.api.call("system.info")
+        interfaces_changed, interfaces = self.api.call_changed(
+            "interface.query", self._collection_params("interface")
+        )
+        update_jobid = self.ds["system_info"].get("update_jobid")
+        if update_jobid:
+            update_job = self.api.query(
+                "core.get_jobs", params=[[["id", "=", update_jobid]]]
+            )
+
+        self._detach("system_info", "interface")
         self.ds["system_info"] = parse_api(
             data=self.ds["system_info"],
-            source=self.api.query("system.info"),
+            source=source,
             vals=[
                 {"name": "version", "default": "unknown"},
                 {"name": "hostname", "default": "unknown"},
@@ -161,16 +1343,28 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
         if not self.api.connected():
             return
 
+        # system.info may be served from the API cache
+        self.ds["system_info"]["uptime_seconds"] += round(
+            self.api.cache_age("system.info")
+        )
+
+        if self.ds["system_info"]["version"] != self._version:
+            if self._version is not None:
+                # Static facts may differ after an upgrade
+                self.api.invalidate_cache()
+
+            self._version = self.ds["system_info"]["version"]
+            self._version_major = 0
+            self._version_minor = 0
+
         if not self.ds["system_info"]["update_available"]:
             self.ds["system_info"]["update_version"] = self.ds["system_info"]["version"]
 
-        if self.ds["system_info"]["update_jobid"]:
+        # A job started after the fetch above is picked up next poll
+        if update_jobid and self.ds["system_info"]["update_jobid"] == update_jobid:
             self.ds["system_info"] = parse_api(
                 data=self.ds["system_info"],
-                source=self.api.query(
-                    "core.get_jobs",
-                    params=[[["id", "=", self.ds["system_info"]["update_jobid"]]]],
-                ),
+                source=update_job,
                 vals=[
                     {
                         "name": "update_progress",
@@ -230,9 +1424,12 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
             )
             self.ds["system_info"]["uptimeEpoch"] = utc_from_timestamp(uptime_tm)
 
+        if not interfaces_changed:
+            return
+
         self.ds["interface"] = parse_api(
             data=self.ds["interface"],
-            source=self.api.query("interface.query"),
+            source=self._filter_records("interface", interfaces),
             key="id",
             vals=[
                 {"name": "id", "default": "unknown"},
@@ -243,16 +1440,19 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                     "name": "link_state",
                     "source": "state/link_state",
                     "default": "unknown",
+                    "intern": True,
                 },
                 {
                     "name": "active_media_type",
                     "source": "state/active_media_type",
                     "default": "unknown",
+                    "intern": True,
                 },
                 {
                     "name": "active_media_subtype",
                     "source": "state/active_media_subtype",
                     "default": "unknown",
+                    "intern": True,
                 },
                 {
                     "name": "link_address",
@@ -270,9 +1470,11 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     #   get_updatecheck
     # ---------------------------
     def get_updatecheck(self) -> None:
+        source = self.api.call("update.check_available")
+        self._detach("system_info")
         self.ds["system_info"] = parse_api(
             data=self.ds["system_info"],
-            source=self.api.query("update.check_available"),
+            source=source,
             vals=[
                 {
                     "name": "update_status",
@@ -320,57 +1522,57 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
         if self._is_virtual:
             tmp_graphs.remove({"name": "cputemp"})
 
-        for tmp in tmp_graphs:
-            if tmp["name"] in self._systemstats_errored:
-                tmp_graphs.remove(tmp)
-
+        now = monotonic()
+        tmp_graphs = [
+            tmp
+            for tmp in tmp_graphs
+            if self._graphs_failed.get("/".join(tmp.values()), 0) <= now
+        ]
         if not tmp_graphs:
             return
 
-        tmp_params = [
-            tmp_graphs,
-            {
-                "start": report_epoch - 30,
-                "end": report_epoch - 90,
-                "aggregate": True,
-            },
-        ]
-
+        tmp_query = {
+            "start": report_epoch - 30,
+            "end": report_epoch - 90,
+            "aggregate": True,
+        }
         reporting_path = "reporting.netdata_get_data"
 
         tmp_graph = self.api.query(
             reporting_path,
-            params=tmp_params,
+            params=[tmp_graphs, tmp_query],
         )
 
         if not isinstance(tmp_graph, list):
-            if self.api.error == 500:
-                for tmp in tmp_params["graphs"]:
-                    tmp_params2 = {
-                        [tmp],
-                        {
-                            "start": report_epoch - 30,
-                            "end": report_epoch - 90,
-                            "aggregate": "true",
-                        },
-                    }
+            if not self.api.connected():
+                raise TrueNASConnectionError(self.api.error)
+
+            # Find the graphs this TrueNAS can not provide, skip them for a while
+            tmp_failed = [
+                "/".join(tmp.values())
+                for tmp in tmp_graphs
+                if not isinstance(
+                    self.api.query(reporting_path, params=[[tmp], tmp_query]), list
+                )
+            ]
+            if not self.api.connected():
+                raise TrueNASConnectionError(self.api.error)
 
-                    tmp2 = self.api.query(
-                        reporting_path,
-                        params=tmp_params2,
-                    )
-                    if not isinstance(tmp2, list) and self.api.error == 500:
-                        self._systemstats_errored.append(tmp["name"])
+            if tmp_failed:
+                for tmp in tmp_failed:
+                    self._graphs_failed[tmp] = now + GRAPH_RETRY_INTERVAL
 
                 _LOGGER.warning(
                     "TrueNAS %s fetching following graphs failed, check your NAS: %s",
                     self.host,
-                    self._systemstats_errored,
+                    tmp_failed,
                 )
-                self.get_systemstats()
+                if len(tmp_failed) < len(tmp_graphs):
+                    self.get_systemstats()
 
             return
 
+        self._detach("system_info", "interface")
         for i in range(len(tmp_graph)):
             if "name" not in tmp_graph[i]:
                 continue
@@ -491,17 +1693,24 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     #   get_service
     # ---------------------------
-    def get_service(self) -> None:
+    def get_service(
+        self, uid: Any | None = None, priority: int = PRIORITY_POLL
+    ) -> None:
         """Get service info from TrueNAS."""
+        changed, source = self._query_records("service", "service.query", uid, priority)
+        if not changed:
+            return
+
+        self._detach("service")
         self.ds["service"] = parse_api(
             data=self.ds["service"],
-            source=self.api.query("service.query"),
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": 0},
-                {"name": "service", "default": "unknown"},
+                {"name": "service", "default": "unknown", "intern": True},
                 {"name": "enable", "type": "bool", "default": False},
-                {"name": "state", "default": "unknown"},
+                {"name": "state", "default": "unknown", "intern": True},
             ],
             ensure_vals=[
                 {"name": "running", "type": "bool", "default": False},
@@ -516,16 +1725,20 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     def get_pool(self) -> None:
         """Get pools from TrueNAS."""
+        source = self.api.call("pool.query")
+        boot_source = self.api.call("boot.get_state")
+        self._detach("pool")
         self.ds["pool"] = parse_api(
             data=self.ds["pool"],
-            source=self.api.query("pool.query"),
+            record="pool",
+            source=source,
             key="guid",
             vals=[
                 {"name": "guid", "default": 0},
                 {"name": "id", "default": 0},
                 {"name": "name", "default": "unknown"},
                 {"name": "path", "default": "unknown"},
-                {"name": "status", "default": "unknown"},
+                {"name": "status", "default": "unknown", "intern": True},
                 {"name": "healthy", "type": "bool", "default": False},
                 {"name": "is_decrypted", "type": "bool", "default": False},
                 {
@@ -567,14 +1780,15 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
 
         self.ds["pool"] = parse_api(
             data=self.ds["pool"],
-            source=self.api.query("boot.get_state"),
+            record="boot_pool",
+            source=boot_source,
             key="name",
             vals=[
                 {"name": "guid", "default": "boot-pool"},
                 {"name": "id", "default": "boot-pool"},
                 {"name": "name", "default": "unknown"},
                 {"name": "path", "default": "unknown"},
-                {"name": "status", "default": "unknown"},
+                {"name": "status", "default": "unknown", "intern": True},
                 {"name": "healthy", "type": "bool", "default": False},
                 {"name": "is_decrypted", "type": "bool", "default": False},
                 {
@@ -629,30 +1843,29 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
         if not self.api.connected():
             return
 
-        # Process pools
-        tmp_dataset_available = {}
-        tmp_dataset_total = {}
-        for uid, vals in self.ds["dataset"].items():
-            tmp_dataset_available[self.ds["dataset"][uid]["mountpoint"]] = vals[
-                "available"
-            ]
-
-            tmp_dataset_total[self.ds["dataset"][uid]["mountpoint"]] = (
-                vals["available"] + vals["used"]
-            )
+        self._process_pool_usage()
 
+    # ---------------------------
+    #   _process_pool_usage
+    # ---------------------------
+    def _process_pool_usage(self) -> None:
+        """Calculate pool usage from the root datasets."""
+        self._detach("pool")
+        datasets = self.columns.get("dataset")
         for uid, vals in self.ds["pool"].items():
-            if vals["path"] in tmp_dataset_available:
-                self.ds["pool"][uid]["available"] = tmp_dataset_available[vals["path"]]
-
-            if vals["path"] in tmp_dataset_total:
-                self.ds["pool"][uid]["total"] = tmp_dataset_total[vals["path"]]
+            # Pool totals come from its root dataset
+            if datasets and vals["name"] in datasets.index:
+                available = datasets.value(vals["name"], "available")
+                self.ds["pool"][uid]["available"] = available
+                self.ds["pool"][uid]["total"] = available + datasets.value(
+                    vals["name"], "used"
+                )
 
             if vals["name"] in ["boot-pool", "freenas-boot"]:
                 self.ds["pool"][uid]["available"] = vals["free"]
                 self.ds["pool"][uid]["total"] = vals["free"] + vals["allocated"]
 
-                self.ds["pool"][uid].pop("root_dataset")
+                self.ds["pool"][uid].pop("root_dataset", None)
 
             if self.ds["pool"][uid]["total"] > 0:
                 self.ds["pool"][uid]["usage"] = round(
@@ -673,15 +1886,22 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     def get_dataset(self) -> None:
         """Get datasets from TrueNAS."""
+        changed, source = self._query_records("dataset", "pool.dataset.query")
+        if not changed:
+            return
+
+        # Replaced as a whole, nothing to copy
+        self._begin_write()
         self.ds["dataset"] = parse_api(
             data={},
-            source=self.api.query("pool.dataset.query"),
+            record="dataset",
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": "unknown"},
-                {"name": "type", "default": "unknown"},
+                {"name": "type", "default": "unknown", "intern": True},
                 {"name": "name", "default": "unknown"},
-                {"name": "pool", "default": "unknown"},
+                {"name": "pool", "default": "unknown", "intern": True},
                 {"name": "mountpoint", "default": "unknown"},
                 {"name": "comments", "source": "comments/parsed", "default": ""},
                 {
@@ -700,19 +1920,31 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                     "name": "casesensitivity",
                     "source": "casesensitivity/parsed",
                     "default": "unknown",
+                    "intern": True,
+                },
+                {
+                    "name": "checksum",
+                    "source": "checksum/parsed",
+                    "default": "unknown",
+                    "intern": True,
                 },
-                {"name": "checksum", "source": "checksum/parsed", "default": "unknown"},
                 {
                     "name": "exec",
                     "source": "exec/parsed",
                     "type": "bool",
                     "default": False,
                 },
-                {"name": "sync", "source": "sync/parsed", "default": "unknown"},
+                {
+                    "name": "sync",
+                    "source": "sync/parsed",
+                    "default": "unknown",
+                    "intern": True,
+                },
                 {
                     "name": "compression",
                     "source": "compression/parsed",
                     "default": "unknown",
+                    "intern": True,
                 },
                 {
                     "name": "compressratio",
@@ -732,12 +1964,16 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                     "name": "encryption_algorithm",
                     "source": "encryption_algorithm/parsed",
                     "default": "unknown",
+                    "intern": True,
                 },
                 {"name": "used", "source": "used/parsed", "default": 0},
                 {"name": "available", "source": "available/parsed", "default": 0},
             ],
         )
 
+        self.columns["dataset"] = ColumnStore(
+            self.ds["dataset"], ("used", "available"), ("pool",), typecode="q"
+        )
         if len(self.ds["dataset"]) == 0:
             return
 
@@ -780,36 +2016,49 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     def get_disk(self) -> None:
         """Get disks from TrueNAS."""
-        self.ds["disk"] = parse_api(
-            data=self.ds["disk"],
-            source=self.api.query("disk.query"),
-            key="identifier",
-            vals=[
-                {"name": "name", "default": "unknown"},
-                {"name": "devname", "default": "unknown"},
-                {"name": "serial", "default": "unknown"},
-                {"name": "size", "default": "unknown"},
-                {"name": "hddstandby", "default": "unknown"},
-                {"name": "hddstandby_force", "type": "bool", "default": False},
-                {"name": "advpowermgmt", "default": "unknown"},
-                {"name": "acousticlevel", "default": "unknown"},
-                {"name": "togglesmart", "type": "bool", "default": False},
-                {"name": "model", "default": "unknown"},
-                {"name": "rotationrate", "default": "unknown"},
-                {"name": "type", "default": "unknown"},
-                {"name": "zfs_guid", "default": "unknown"},
-                {"name": "identifier", "default": "unknown"},
-            ],
-            ensure_vals=[
-                {"name": "temperature", "default": 0},
-            ],
-        )
+        changed, source = self._query_records("disk", "disk.query")
 
         # Get disk temperatures
-        temps = self.api.query(
-            "disk.temperatures",
-            params={},
-        )
+        temps_changed, temps = False, None
+        if self.supports("disk.temperatures"):
+            temps_changed, temps = self.api.query_changed(
+                "disk.temperatures",
+                params={},
+            )
+
+        if temps_changed:
+            self._cycle_unchanged.discard("disk")
+
+        if not changed and not temps_changed:
+            return
+
+        self._detach("disk")
+        if changed:
+            self.ds["disk"] = parse_api(
+                data=self.ds["disk"],
+                record="disk",
+                source=source,
+                key="identifier",
+                vals=[
+                    {"name": "name", "default": "unknown"},
+                    {"name": "devname", "default": "unknown"},
+                    {"name": "serial", "default": "unknown"},
+                    {"name": "size", "default": "unknown"},
+                    {"name": "hddstandby", "default": "unknown", "intern": True},
+                    {"name": "hddstandby_force", "type": "bool", "default": False},
+                    {"name": "advpowermgmt", "default": "unknown", "intern": True},
+                    {"name": "acousticlevel", "default": "unknown", "intern": True},
+                    {"name": "togglesmart", "type": "bool", "default": False},
+                    {"name": "model", "default": "unknown", "intern": True},
+                    {"name": "rotationrate", "default": "unknown", "intern": True},
+                    {"name": "type", "default": "unknown", "intern": True},
+                    {"name": "zfs_guid", "default": "unknown"},
+                    {"name": "identifier", "default": "unknown"},
+                ],
+                ensure_vals=[
+                    {"name": "temperature", "default": 0},
+                ],
+            )
 
         if temps:
             for uid, vals in self.ds["disk"].items():
@@ -818,42 +2067,62 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                     # return devname temp to uid disk
                     # I feel like this will break in the future when TrueNAS updates to a more sensible system. Currently their own long term stats are broken by the changing devnames.
 
+        self.columns["disk"] = ColumnStore(self.ds["disk"], ("size", "temperature"))
+
     # ---------------------------
     #   get_vm
     # ---------------------------
-    def get_vm(self) -> None:
+    def get_vm(self, uid: Any | None = None, priority: int = PRIORITY_POLL) -> None:
         """Get VMs from TrueNAS."""
+        changed, source = self._query_records(
+            "vm", "virt.instance.query", uid, priority
+        )
+        if not changed:
+            return
+
+        self._detach("vm")
         self.ds["vm"] = parse_api(
             data=self.ds["vm"],
-            source=self.api.query("virt.instance.query"),
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": 0},
                 {"name": "name", "default": "unknown"},
-                {"name": "type", "default": "unknown"},
+                {"name": "type", "default": "unknown", "intern": True},
                 {"name": "cpu", "default": 0},
                 {"name": "memory", "default": 0},
                 {"name": "autostart", "type": "bool", "default": False},
                 {"name": "image", "source": "image/description", "default": "unknown"},
-                {"name": "status", "default": "unknown"},
+                {"name": "status", "default": "unknown", "intern": True},
             ],
             ensure_vals=[
                 {"name": "running", "type": "bool", "default": False},
             ],
         )
 
-        for uid, vals in self.ds["vm"].items():
-            self.ds["vm"][uid]["memory"] = round(vals["memory"] / 1024 / 1024 / 1024)
-            self.ds["vm"][uid]["running"] = vals["status"] == "RUNNING"
+        # Only convert records parsed from this response
+        for entry in source if isinstance(source, list) else []:
+            if (vals := self.ds["vm"].get(entry.get("id"))) is not None:
+                vals["memory"] = round(vals["memory"] / 1024 / 1024 / 1024)
+                vals["running"] = vals["status"] == "RUNNING"
 
     # ---------------------------
     #   get_cloudsync
     # ---------------------------
-    def get_cloudsync(self) -> None:
+    def get_cloudsync(
+        self, uid: Any | None = None, priority: int = PRIORITY_POLL
+    ) -> None:
         """Get cloudsync from TrueNAS."""
+        changed, source = self._query_records(
+            "cloudsync", "cloudsync.query", uid, priority
+        )
+        if not changed:
+            return
+
+        self._detach("cloudsync")
         self.ds["cloudsync"] = parse_api(
             data=self.ds["cloudsync"],
-            source=self.api.query("cloudsync.query"),
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": "unknown"},
@@ -863,7 +2132,13 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                 {"name": "enabled", "type": "bool", "default": False},
                 {"name": "transfer_mode", "default": "unknown"},
                 {"name": "snapshot", "type": "bool", "default": False},
-                {"name": "state", "source": "job/state", "default": "unknown"},
+                {
+                    "name": "state",
+                    "source": "job/state",
+                    "default": "unknown",
+                    "intern": True,
+                },
+                {"name": "job_id", "source": "job/id", "default": 0},
                 {
                     "name": "time_started",
                     "source": "job/time_started/$date",
@@ -888,11 +2163,20 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     #   get_replication
     # ---------------------------
-    def get_replication(self) -> None:
+    def get_replication(
+        self, uid: Any | None = None, priority: int = PRIORITY_POLL
+    ) -> None:
         """Get replication from TrueNAS."""
+        changed, source = self._query_records(
+            "replication", "replication.query", uid, priority
+        )
+        if not changed:
+            return
+
+        self._detach("replication")
         self.ds["replication"] = parse_api(
             data=self.ds["replication"],
-            source=self.api.query("replication.query"),
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": 0},
@@ -905,7 +2189,13 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                 {"name": "transport", "default": "unknown"},
                 {"name": "auto", "type": "bool", "default": False},
                 {"name": "retention_policy", "default": "unknown"},
-                {"name": "state", "source": "job/state", "default": "unknown"},
+                {
+                    "name": "state",
+                    "source": "job/state",
+                    "default": "unknown",
+                    "intern": True,
+                },
+                {"name": "job_id", "source": "job/id", "default": 0},
                 {
                     "name": "time_started",
                     "source": "job/time_started/$date",
@@ -930,23 +2220,37 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     #   get_snapshottask
     # ---------------------------
-    def get_snapshottask(self) -> None:
+    def get_snapshottask(
+        self, uid: Any | None = None, priority: int = PRIORITY_POLL
+    ) -> None:
         """Get replication from TrueNAS."""
+        changed, source = self._query_records(
+            "snapshottask", "pool.snapshottask.query", uid, priority
+        )
+        if not changed:
+            return
+
+        self._detach("snapshottask")
         self.ds["snapshottask"] = parse_api(
             data=self.ds["snapshottask"],
-            source=self.api.query("pool.snapshottask.query"),
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": 0},
                 {"name": "dataset", "default": "unknown"},
                 {"name": "recursive", "type": "bool", "default": False},
                 {"name": "lifetime_value", "default": 0},
-                {"name": "lifetime_unit", "default": "unknown"},
+                {"name": "lifetime_unit", "default": "unknown", "intern": True},
                 {"name": "enabled", "type": "bool", "default": False},
                 {"name": "naming_schema", "default": "unknown"},
                 {"name": "allow_empty", "type": "bool", "default": False},
                 {"name": "vmware_sync", "type": "bool", "default": False},
-                {"name": "state", "source": "state/state", "default": "unknown"},
+                {
+                    "name": "state",
+                    "source": "state/state",
+                    "default": "unknown",
+                    "intern": True,
+                },
                 {
                     "name": "datetime",
                     "source": "state/datetime/$date",
@@ -959,11 +2263,17 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
     # ---------------------------
     #   get_app
     # ---------------------------
-    def get_app(self) -> None:
+    def get_app(self, uid: Any | None = None, priority: int = PRIORITY_POLL) -> None:
         """Get Apps from TrueNAS."""
+        changed, source = self._query_records("app", "app.query", uid, priority)
+        if not changed:
+            return
+
+        self._detach("app")
         self.ds["app"] = parse_api(
             data=self.ds["app"],
-            source=self.api.query("app.query"),
+            record="app",
+            source=source,
             key="id",
             vals=[
                 {"name": "id", "default": 0},
@@ -988,7 +2298,7 @@ class TrueNASCoordinator(DataUpdateCoordinator[None]):
                     "source": "portals/Web UI",
                     "default": "unknown",
                 },
-                {"name": "state", "default": "unknown"},
+                {"name": "state", "default": "unknown", "intern": True},
             ],
             ensure_vals=[
                 {"name": "running", "type": "bool", "default": False},
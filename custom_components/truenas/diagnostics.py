@@ -15,12 +15,18 @@ async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
     return {
         "entry": {
             "data": async_redact_data(config_entry.data, TO_REDACT),
             "options": async_redact_data(config_entry.options, TO_REDACT),
         },
-        "data": async_redact_data(
-            hass.data[DOMAIN][config_entry.entry_id].ds, TO_REDACT
-        ),
+        "data": async_redact_data(coordinator.data, TO_REDACT),
+        "api": {
+            "lanes": coordinator.api.lane_stats,
+        },
+        "poll": coordinator.poll_stats,
+        "scheduler": coordinator.scheduler.stats(config_entry.entry_id),
+        "aggregates": coordinator.aggregates,
+        "capabilities": coordinator.capabilities,
     }
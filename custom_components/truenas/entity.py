@@ -8,7 +8,8 @@ from typing import Any, Callable
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ATTRIBUTION, CONF_HOST, CONF_NAME
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import (
     entity_platform as ep,
     entity_registry as er,
@@ -22,6 +23,7 @@ from .const import (
     ATTRIBUTION,
     DOMAIN,
 )
+from .apiparser import from_entry
 from .coordinator import TrueNASCoordinator
 from .helper import format_attribute
 
@@ -40,7 +42,14 @@ async def async_add_entities(
     descriptions = platform.platform.SENSOR_TYPES
 
     for service in services:
-        platform.async_register_entity_service(service[0], service[1], service[2])
+        platform.async_register_entity_service(
+            service[0],
+            service[1],
+            service[2],
+            supports_response=(
+                service[3] if len(service) > 3 else SupportsResponse.NONE
+            ),
+        )
 
     @callback
     async def async_update_controller(coordinator):
@@ -58,6 +67,18 @@ async def async_add_entities(
                 platform.domain, DOMAIN, unique_id
             )
             entity = entity_registry.async_get(entity_id)
+            if uid:
+                coordinator.async_track_consumer(
+                    obj.entity_description.data_path,
+                    uid,
+                    unique_id,
+                    (
+                        entity.disabled is False
+                        if entity
+                        else obj.entity_registry_enabled_default
+                    ),
+                )
+
             if entity is None or (
                 (entity_id not in platform.entities) and (entity.disabled is False)
             ):
@@ -80,10 +101,13 @@ async def async_add_entities(
                     )
                     await async_check_exist(obj, coordinator, uid)
 
-    await async_update_controller(hass.data[DOMAIN][config_entry.entry_id])
-
-    unsub = async_dispatcher_connect(hass, "update_sensors", async_update_controller)
-    config_entry.async_on_unload(unsub)
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, coordinator.signal_new_entities, async_update_controller
+        )
+    )
+    await async_update_controller(coordinator)
 
 
 # ---------------------------
@@ -107,6 +131,8 @@ class TrueNASEntity(CoordinatorEntity[TrueNASCoordinator], Entity):
         self._config_entry = self.coordinator.config_entry
         self._attr_extra_state_attributes = {ATTR_ATTRIBUTION: ATTRIBUTION}
         self._uid = uid
+        self._optimistic = {}
+        self._optimistic_since = 0.0
         if self._uid:
             self._data = coordinator.data[self.entity_description.data_path][self._uid]
         else:
@@ -122,15 +148,153 @@ class TrueNASEntity(CoordinatorEntity[TrueNASCoordinator], Entity):
 
         self.entity_id = f"{platform.domain}.{self._inst.lower()}_{slugify(str(dev_group).lower())}_{slugify(str(self.name).lower())}"
 
+    async def async_added_to_hass(self) -> None:
+        """Register record listener."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_record_listener(
+                self.entity_description.data_path,
+                self._uid,
+                self._async_update_from_data,
+            )
+        )
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        self._data = self.coordinator.data[self.entity_description.data_path]
+        """Skip state writes when the poll returned identical data."""
+        if (
+            not self._optimistic
+            and self.coordinator.last_update_success
+            and self.coordinator.data_unchanged(self.entity_description.data_path)
+        ):
+            return
+
+        self._async_update_from_data()
+
+    @callback
+    def _async_update_from_data(self) -> None:
+        """Update entity from coordinator data."""
+        data = self.coordinator.data[self.entity_description.data_path]
         if self._uid:
-            self._data = self.coordinator.data[self.entity_description.data_path][
-                self._uid
-            ]
+            if self._uid not in data:
+                # Record was filtered out or removed, keep the last data
+                super()._handle_coordinator_update()
+                return
+
+            data = data[self._uid]
+
+        self._data = data
+
+        if self._optimistic:
+            if self.coordinator.fetched_since(
+                self.entity_description.data_path, self._uid, self._optimistic_since
+            ):
+                self._optimistic = {}
+            else:
+                self._data = {**self._data, **self._optimistic}
+
         super()._handle_coordinator_update()
 
+    @property
+    def available(self) -> bool:
+        """Return if the data of this entity could be fetched."""
+        if self._uid and self._uid not in self.coordinator.data.get(
+            self.entity_description.data_path, {}
+        ):
+            return False
+
+        return super().available and not self.coordinator.is_stale(
+            self.entity_description.data_path
+        )
+
+    @property
+    def uid(self) -> Any | None:
+        """Return the uid of the record this entity represents."""
+        return self._uid
+
+    @callback
+    def async_set_optimistic(self, **optimistic: Any) -> None:
+        """Show the expected state until a newer refresh arrives."""
+        self._optimistic = optimistic
+        self._optimistic_since = self.coordinator.invalidate_record(
+            self.entity_description.data_path, self._uid
+        )
+        self._data = {**self._data, **optimistic}
+        self.async_write_ha_state()
+
+    async def _async_get_state(
+        self,
+        service: str,
+        source: str = "state",
+        attribute: str | None = None,
+        default: Any = None,
+    ) -> Any:
+        """Return current state, from coordinator data when recent enough."""
+        record = self.coordinator.get_fresh_record(
+            self.entity_description.data_path, self._uid
+        )
+        if record is not None:
+            return record.get(attribute or source, default)
+
+        tmp = await self.coordinator.async_action(service, [self._data["id"]])
+        if not isinstance(tmp, dict):
+            return None
+
+        return from_entry(tmp, source, default=default)
+
+    async def _async_job_response(
+        self, job_id: Any, wait: bool, timeout: float
+    ) -> dict[str, Any]:
+        """Return service response for a job, waiting for it if requested."""
+        if not isinstance(job_id, int):
+            raise HomeAssistantError(f"{self.entity_id} job could not be started")
+
+        if not wait:
+            return {"job_id": job_id}
+
+        tmp_job = await self.coordinator.async_wait_job(job_id, timeout)
+        await self.coordinator.async_refresh_record(
+            self.entity_description.data_path, self._uid
+        )
+        if tmp_job is None:
+            return {"job_id": job_id, "finished": False}
+
+        return {
+            "job_id": job_id,
+            "finished": True,
+            "state": tmp_job.get("state"),
+            "result": tmp_job.get("result"),
+            "error": tmp_job.get("error"),
+        }
+
+    async def _async_action(
+        self, service: str, params: dict[str, Any] | list, **optimistic: Any
+    ) -> Any:
+        """Run an action, showing the expected state until data confirms it."""
+        if optimistic:
+            self.async_set_optimistic(**optimistic)
+
+        ret = await self.coordinator.async_action(service, params)
+        # Results are unwrapped, a raw JSON-RPC payload means the call failed
+        failed = ret is None or (
+            isinstance(ret, dict) and "jsonrpc" in ret and "result" not in ret
+        )
+        if failed and optimistic:
+            _LOGGER.warning(
+                "%s %s failed (%s), reverting optimistic state",
+                self.entity_id,
+                service,
+                (
+                    from_entry(ret, "error/message", "connection error")
+                    if ret
+                    else "connection error"
+                ),
+            )
+            self._optimistic = {}
+            self._async_update_from_data()
+
+        return ret
+
     @property
     def name(self) -> str:
         """Return the name for this entity."""
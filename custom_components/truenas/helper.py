@@ -1,5 +1,8 @@
 """Helper functions."""
 
+import re
+from fnmatch import fnmatchcase, translate
+
 
 # ---------------------------
 #   format_attribute
@@ -17,3 +20,60 @@ def format_attribute(attr: str) -> str:
     attr = attr.replace("Ip4 ", "IP4 ")
     attr = attr.replace("Ip6 ", "IP6 ")
     return attr
+
+
+# ---------------------------
+#   match_patterns
+# ---------------------------
+def match_patterns(value: str, patterns: list[str]) -> bool:
+    """Return True if value matches a glob, or a regex prefixed with re:."""
+    for pattern in patterns:
+        if pattern.startswith("re:"):
+            if re.search(pattern[3:], value):
+                return True
+        elif fnmatchcase(value, pattern):
+            return True
+
+    return False
+
+
+# ---------------------------
+#   pattern_filter
+# ---------------------------
+def pattern_filter(field: str, pattern: str, exclude: bool = False) -> list | None:
+    """Return a query-filter for a glob pattern, None if it can only match locally."""
+    if pattern.startswith("re:"):
+        return None
+
+    body = pattern.strip("*")
+    if not any(char in body for char in "*?["):
+        if pattern == body:
+            return [field, "!=" if exclude else "=", body]
+
+        if pattern == f"{body}*":
+            return [field, "!^" if exclude else "^", body]
+
+        if pattern == f"*{body}":
+            return [field, "!$" if exclude else "$", body]
+
+    return None if exclude else [field, "~", f"^{translate(pattern)}"]
+
+
+# ---------------------------
+#   record_filters
+# ---------------------------
+def record_filters(field: str, include: list[str], exclude: list[str]) -> list:
+    """Return query-filters covering as much of include and exclude as possible."""
+    filters = []
+    if include and "*" not in include:
+        tmp_include = [pattern_filter(field, pattern) for pattern in include]
+        if None not in tmp_include:
+            filters.append(
+                tmp_include[0] if len(tmp_include) == 1 else ["OR", tmp_include]
+            )
+
+    for pattern in exclude:
+        if (tmp_exclude := pattern_filter(field, pattern, exclude=True)) is not None:
+            filters.append(tmp_exclude)
+
+    return filters
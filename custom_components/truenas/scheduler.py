@@ -0,0 +1,115 @@
+"""Share TrueNAS I/O between config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .api import PRIORITY_ACTION, PRIORITY_POLL
+from .const import DOMAIN, MAX_CONCURRENT_IO, POLL_STAGGER_MAX
+
+
+# ---------------------------
+#   async_get_scheduler
+# ---------------------------
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> EntryScheduler:
+    """Return the scheduler shared by all TrueNAS entries."""
+    if (scheduler := hass.data.get(f"{DOMAIN}_scheduler")) is None:
+        scheduler = hass.data[f"{DOMAIN}_scheduler"] = EntryScheduler()
+
+    return scheduler
+
+
+# ---------------------------
+#   EntryScheduler
+# ---------------------------
+class EntryScheduler(object):
+    """Stagger poll cycles of entries and cap their concurrent I/O."""
+
+    def __init__(self, max_io: int = MAX_CONCURRENT_IO) -> None:
+        """Initialize the scheduler."""
+        self._semaphore = asyncio.Semaphore(max_io)
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._next_start = 0.0
+
+    # ---------------------------
+    #   async_register
+    # ---------------------------
+    @callback
+    def async_register(self, entry_id: str) -> CALLBACK_TYPE:
+        """Add an entry to the budget, return a callback removing it."""
+        self._entries[entry_id] = {
+            "since": monotonic(),
+            "jobs": 0,
+            "busy": 0.0,
+            "wait": 0.0,
+            "stagger": 0.0,
+        }
+
+        @callback
+        def unregister() -> None:
+            """Remove entry from the budget."""
+            self._entries.pop(entry_id, None)
+
+        return unregister
+
+    # ---------------------------
+    #   async_stagger
+    # ---------------------------
+    async def async_stagger(self, entry_id: str, interval: float) -> None:
+        """Delay a poll cycle that would start right after another entry's."""
+        if len(self._entries) < 2:
+            return
+
+        now = monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + min(interval / len(self._entries), POLL_STAGGER_MAX)
+        if start > now:
+            self._entries[entry_id]["stagger"] += start - now
+            await asyncio.sleep(start - now)
+
+    # ---------------------------
+    #   slot
+    # ---------------------------
+    @asynccontextmanager
+    async def slot(self, entry_id: str, priority: int = PRIORITY_POLL):
+        """Hold one of the global I/O slots, actions never wait for polls."""
+        queued = monotonic()
+        if priority != PRIORITY_ACTION:
+            await self._semaphore.acquire()
+
+        started = monotonic()
+        try:
+            yield
+        finally:
+            if priority != PRIORITY_ACTION:
+                self._semaphore.release()
+
+            if entry := self._entries.get(entry_id):
+                entry["jobs"] += 1
+                entry["wait"] += started - queued
+                entry["busy"] += monotonic() - started
+
+    # ---------------------------
+    #   stats
+    # ---------------------------
+    def stats(self, entry_id: str) -> dict[str, Any]:
+        """Return the share of the I/O budget an entry used."""
+        if (entry := self._entries.get(entry_id)) is None:
+            return {}
+
+        busy_total = sum(tmp["busy"] for tmp in self._entries.values())
+        return {
+            "entries": len(self._entries),
+            "jobs": entry["jobs"],
+            "busy_s": round(entry["busy"], 1),
+            "share": round(entry["busy"] / busy_total, 2) if busy_total else 0,
+            "load": round(entry["busy"] / max(monotonic() - entry["since"], 1), 3),
+            "wait_s": round(entry["wait"], 1),
+            "stagger_s": round(entry["stagger"], 1),
+        }
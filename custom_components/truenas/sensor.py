@@ -5,13 +5,16 @@ from __future__ import annotations
 from logging import getLogger
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .const import JOB_TIMEOUT, SNAPSHOT_PREFIX
 from .coordinator import TrueNASCoordinator
 from .entity import TrueNASEntity, async_add_entities
 from .sensor_types import (
@@ -84,16 +87,14 @@ class TrueNASUptimeSensor(TrueNASSensor):
 
     async def restart(self) -> None:
         """Restart TrueNAS systen."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self.coordinator.async_action(
             "system.reboot",
             ["Home Assistant Integration"],
         )
 
     async def stop(self) -> None:
         """Shutdown TrueNAS systen."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self.coordinator.async_action(
             "system.shutdown",
             ["Home Assistant Integration"],
         )
@@ -105,14 +106,23 @@ class TrueNASUptimeSensor(TrueNASSensor):
 class TrueNASDatasetSensor(TrueNASSensor):
     """Define an TrueNAS Dataset sensor."""
 
-    async def snapshot(self) -> None:
+    async def snapshot(self) -> dict[str, Any]:
         """Create dataset snapshot."""
         ts = datetime.now().isoformat(sep="_", timespec="microseconds")
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        tmp_snapshot = await self.coordinator.async_action(
             "zfs.snapshot.create",
-            {"dataset": f"{self._data['name']}", "name": f"custom-{ts}"},
+            {"dataset": f"{self._data['name']}", "name": f"{SNAPSHOT_PREFIX}{ts}"},
         )
+        if tmp_snapshot is None or (
+            isinstance(tmp_snapshot, dict) and "error" in tmp_snapshot
+        ):
+            raise HomeAssistantError(f"{self.entity_id} snapshot could not be created")
+
+        name = f"{self._data['name']}@{SNAPSHOT_PREFIX}{ts}"
+        if isinstance(tmp_snapshot, dict):
+            name = tmp_snapshot.get("name", name)
+
+        return {"snapshot": name}
 
 
 # ---------------------------
@@ -121,25 +131,21 @@ class TrueNASDatasetSensor(TrueNASSensor):
 class TrueNASClousyncSensor(TrueNASSensor):
     """Define an TrueNAS Cloudsync sensor."""
 
-    async def start(self) -> None:
+    async def start(
+        self, wait: bool = False, timeout: int = JOB_TIMEOUT
+    ) -> dict[str, Any] | None:
         """Run cloudsync job."""
-        tmp_job = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "cloudsync.get_instance",
-            [self._data["id"]],
+        state = await self._async_get_state(
+            "cloudsync.get_instance", "job/state", "state", default="unknown"
         )
-
-        if "job" not in tmp_job:
+        if state is None:
             _LOGGER.error(
                 "Clousync job %s (%s) invalid",
                 self._data["description"],
                 self._data["id"],
             )
             return
-        if "state" in tmp_job["job"] and tmp_job["job"]["state"] in [
-            "WAITING",
-            "RUNNING",
-        ]:
+        if state in ["WAITING", "RUNNING"]:
             _LOGGER.warning(
                 "Clousync job %s (%s) is already running",
                 self._data["description"],
@@ -147,31 +153,26 @@ class TrueNASClousyncSensor(TrueNASSensor):
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        job_id = await self._async_action(
             "cloudsync.sync",
             [self._data["id"]],
+            state="RUNNING",
         )
+        return await self._async_job_response(job_id, wait, timeout)
 
     async def stop(self) -> None:
         """Abort cloudsync job."""
-        tmp_job = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
-            "cloudsync.get_instance",
-            [self._data["id"]],
+        state = await self._async_get_state(
+            "cloudsync.get_instance", "job/state", "state", default="unknown"
         )
-
-        if "job" not in tmp_job:
+        if state is None:
             _LOGGER.error(
                 "Clousync job %s (%s) invalid",
                 self._data["description"],
                 self._data["id"],
             )
             return
-        if "state" in tmp_job["job"] and tmp_job["job"]["state"] not in [
-            "WAITING",
-            "RUNNING",
-        ]:
+        if state not in ["WAITING", "RUNNING"]:
             _LOGGER.warning(
                 "Clousync job %s (%s) is not running",
                 self._data["description"],
@@ -179,8 +180,8 @@ class TrueNASClousyncSensor(TrueNASSensor):
             )
             return
 
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        await self._async_action(
             "cloudsync.abort",
             [self._data["id"]],
+            state="ABORTED",
         )
@@ -16,6 +16,7 @@ from homeassistant.const import (
     UnitOfDataRate,
     UnitOfInformation,
 )
+from homeassistant.core import SupportsResponse
 from homeassistant.helpers.entity import EntityCategory
 
 from .const import (
@@ -437,9 +438,19 @@ SENSOR_TYPES: tuple[TrueNASSensorEntityDescription, ...] = (
 )
 
 SENSOR_SERVICES = [
-    [SERVICE_CLOUDSYNC_RUN, SCHEMA_SERVICE_CLOUDSYNC_RUN, "start"],
+    [
+        SERVICE_CLOUDSYNC_RUN,
+        SCHEMA_SERVICE_CLOUDSYNC_RUN,
+        "start",
+        SupportsResponse.OPTIONAL,
+    ],
     [SERVICE_CLOUDSYNC_ABORT, SCHEMA_SERVICE_CLOUDSYNC_ABORT, "stop"],
-    [SERVICE_DATASET_SNAPSHOT, SCHEMA_SERVICE_DATASET_SNAPSHOT, "snapshot"],
+    [
+        SERVICE_DATASET_SNAPSHOT,
+        SCHEMA_SERVICE_DATASET_SNAPSHOT,
+        "snapshot",
+        SupportsResponse.OPTIONAL,
+    ],
     [SERVICE_SYSTEM_REBOOT, SCHEMA_SERVICE_SYSTEM_REBOOT, "restart"],
     [SERVICE_SYSTEM_SHUTDOWN, SCHEMA_SERVICE_SYSTEM_SHUTDOWN, "stop"],
 ]
@@ -0,0 +1,449 @@
+"""TrueNAS integration services."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from fnmatch import fnmatchcase
+from logging import getLogger
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from .const import (
+    DOMAIN,
+    SERVICE_APP_START_MANY,
+    SERVICE_APP_STOP_MANY,
+    SERVICE_DATASET_SNAPSHOT_MANY,
+    SERVICE_DATASET_SNAPSHOT_PRUNE,
+    SERVICE_SERVICE_RESTART_MANY,
+    SERVICE_SERVICE_START_MANY,
+    SERVICE_SERVICE_STOP_MANY,
+    SERVICE_SNAPSHOT_DATASETS,
+    SERVICE_SNAPSHOT_KEEP,
+    SERVICE_SNAPSHOT_RECURSIVE,
+    SERVICE_VM_START_MANY,
+    SERVICE_VM_STOP_MANY,
+    SNAPSHOT_DELETE_BATCH,
+    SNAPSHOT_PREFIX,
+)
+from .coordinator import TrueNASCoordinator
+from .helper import record_filters
+
+_LOGGER = getLogger(__name__)
+
+SCHEMA_SERVICE_MANY = cv.make_entity_service_schema({})
+SCHEMA_SERVICE_SNAPSHOT_TARGETS = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(SERVICE_SNAPSHOT_DATASETS, default=[]): vol.All(
+        cv.ensure_list, [cv.string]
+    ),
+}
+SCHEMA_SERVICE_DATASET_SNAPSHOT_MANY = cv.make_entity_service_schema(
+    {
+        **SCHEMA_SERVICE_SNAPSHOT_TARGETS,
+        vol.Optional(SERVICE_SNAPSHOT_RECURSIVE, default=False): cv.boolean,
+    }
+)
+SCHEMA_SERVICE_DATASET_SNAPSHOT_PRUNE = cv.make_entity_service_schema(
+    {
+        **SCHEMA_SERVICE_SNAPSHOT_TARGETS,
+        vol.Required(SERVICE_SNAPSHOT_KEEP): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+
+BULK_ACTIONS: dict[str, dict[str, Any]] = {
+    SERVICE_APP_START_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "app",
+        "method": "app.start",
+        "params": lambda data: [data["id"]],
+        "skip": lambda data: data["state"] == "RUNNING",
+        "optimistic": {"state": "RUNNING", "running": True},
+    },
+    SERVICE_APP_STOP_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "app",
+        "method": "app.stop",
+        "params": lambda data: [data["id"]],
+        "skip": lambda data: data["state"] != "RUNNING",
+        "optimistic": {"state": "STOPPED", "running": False},
+    },
+    SERVICE_VM_START_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "vm",
+        "method": "virt.instance.start",
+        "params": lambda data: [data["id"]],
+        "skip": lambda data: data["status"] != "STOPPED",
+        "optimistic": {"status": "RUNNING", "running": True},
+    },
+    SERVICE_VM_STOP_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "vm",
+        "method": "virt.instance.stop",
+        "params": lambda data: [data["id"], {"timeout": 0, "force": True}],
+        "skip": lambda data: data["status"] != "RUNNING",
+        "optimistic": {"status": "STOPPED", "running": False},
+    },
+    SERVICE_SERVICE_START_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "service",
+        "method": "service.start",
+        "params": lambda data: [data["service"]],
+        "skip": lambda data: data["state"] != "STOPPED",
+        "optimistic": {"state": "RUNNING", "running": True},
+    },
+    SERVICE_SERVICE_STOP_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "service",
+        "method": "service.stop",
+        "params": lambda data: [data["service"]],
+        "skip": lambda data: data["state"] == "STOPPED",
+        "optimistic": {"state": "STOPPED", "running": False},
+    },
+    SERVICE_SERVICE_RESTART_MANY: {
+        "platform": "binary_sensor",
+        "data_path": "service",
+        "method": "service.restart",
+        "params": lambda data: [data["service"]],
+        "skip": lambda data: data["state"] == "STOPPED",
+        "optimistic": {},
+    },
+}
+
+
+# ---------------------------
+#   async_setup_services
+# ---------------------------
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration wide services."""
+
+    async def async_bulk_action(call: ServiceCall) -> None:
+        """Run an action on many entities with one core.bulk call per NAS."""
+        await _async_bulk_action(hass, call)
+
+    async def async_snapshot_many(call: ServiceCall) -> ServiceResponse:
+        """Snapshot many datasets with one core.bulk call per NAS."""
+        return await _async_snapshot_many(hass, call)
+
+    async def async_snapshot_prune(call: ServiceCall) -> ServiceResponse:
+        """Delete custom snapshots beyond the retention count."""
+        return await _async_snapshot_prune(hass, call)
+
+    for service in BULK_ACTIONS:
+        hass.services.async_register(
+            DOMAIN, service, async_bulk_action, schema=SCHEMA_SERVICE_MANY
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DATASET_SNAPSHOT_MANY,
+        async_snapshot_many,
+        schema=SCHEMA_SERVICE_DATASET_SNAPSHOT_MANY,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DATASET_SNAPSHOT_PRUNE,
+        async_snapshot_prune,
+        schema=SCHEMA_SERVICE_DATASET_SNAPSHOT_PRUNE,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+# ---------------------------
+#   _async_get_entities
+# ---------------------------
+@callback
+def _async_get_entities(
+    hass: HomeAssistant, entity_ids: set[str], platform_domain: str, data_path: str
+) -> list:
+    """Return TrueNAS entities for entity_ids backed by records in data_path."""
+    entities = []
+    for platform in async_get_platforms(hass, DOMAIN):
+        if platform.domain != platform_domain:
+            continue
+
+        for entity_id in entity_ids:
+            entity = platform.entities.get(entity_id)
+            if (
+                entity is not None
+                and entity.entity_description.data_path == data_path
+                and entity.uid is not None
+            ):
+                # Records filtered out by options or removed on the NAS
+                if entity.uid not in entity.coordinator.data.get(data_path, {}):
+                    _LOGGER.warning(
+                        "%s skipped, its %s record is no longer available",
+                        entity_id,
+                        data_path,
+                    )
+                    continue
+
+                entities.append(entity)
+
+    return entities
+
+
+# ---------------------------
+#   _async_bulk_action
+# ---------------------------
+async def _async_bulk_action(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Group targeted entities per NAS and run the action in bulk."""
+    action = BULK_ACTIONS[call.service]
+    entity_ids = await async_extract_entity_ids(hass, call)
+
+    batches: dict[TrueNASCoordinator, list] = {}
+    for entity in _async_get_entities(
+        hass, entity_ids, action["platform"], action["data_path"]
+    ):
+        record = entity.coordinator.get_fresh_record(action["data_path"], entity.uid)
+        if record is not None and action["skip"](record):
+            _LOGGER.debug("%s skipped, already in requested state", entity.entity_id)
+            continue
+
+        batches.setdefault(entity.coordinator, []).append(entity)
+
+    await asyncio.gather(
+        *(
+            _async_run_bulk(coordinator, call.service, action, entities)
+            for coordinator, entities in batches.items()
+        )
+    )
+
+
+# ---------------------------
+#   _async_run_bulk
+# ---------------------------
+async def _async_run_bulk(
+    coordinator: TrueNASCoordinator,
+    service: str,
+    action: dict[str, Any],
+    entities: list,
+) -> None:
+    """Send one core.bulk call and wait for its job."""
+    params = [
+        action["params"](coordinator.data[action["data_path"]][entity.uid])
+        for entity in entities
+    ]
+    for entity in entities:
+        if action["optimistic"]:
+            entity.async_set_optimistic(**action["optimistic"])
+
+    results = await _async_wait_bulk(coordinator, action["method"], params, service)
+    for entity, result in zip(entities, results or []):
+        if result.get("error"):
+            _LOGGER.error(
+                "TrueNAS %s %s failed for %s: %s",
+                coordinator.host,
+                service,
+                entity.entity_id,
+                result["error"],
+            )
+
+    await coordinator.async_refresh_record(action["data_path"])
+
+
+# ---------------------------
+#   _async_wait_bulk
+# ---------------------------
+async def _async_wait_bulk(
+    coordinator: TrueNASCoordinator, method: str, params: list, description: str
+) -> list[dict] | None:
+    """Run method through core.bulk and return per call results."""
+    job_id = await coordinator.async_action(
+        "core.bulk", [method, params, f"Home Assistant {description}"]
+    )
+    if not isinstance(job_id, int):
+        _LOGGER.error(
+            "TrueNAS %s %s could not be started", coordinator.host, description
+        )
+        return None
+
+    tmp_job = await coordinator.async_wait_job(job_id)
+    if tmp_job is None:
+        _LOGGER.warning(
+            "TrueNAS %s %s did not finish in time", coordinator.host, description
+        )
+        return None
+
+    if tmp_job["state"] != "SUCCESS":
+        _LOGGER.error(
+            "TrueNAS %s %s failed: %s",
+            coordinator.host,
+            description,
+            tmp_job.get("error"),
+        )
+        return None
+
+    return tmp_job.get("result") or []
+
+
+# ---------------------------
+#   _async_get_datasets
+# ---------------------------
+async def _async_get_datasets(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[TrueNASCoordinator, list[str]]:
+    """Resolve targeted entities and dataset globs to dataset names per NAS."""
+    datasets: dict[TrueNASCoordinator, set[str]] = {}
+    entity_ids = await async_extract_entity_ids(hass, call)
+    for entity in _async_get_entities(hass, entity_ids, "sensor", "dataset"):
+        datasets.setdefault(entity.coordinator, set()).add(
+            entity.coordinator.data["dataset"][entity.uid]["name"]
+        )
+
+    if patterns := call.data[SERVICE_SNAPSHOT_DATASETS]:
+        for entry_id, coordinator in hass.data.get(DOMAIN, {}).items():
+            if call.data.get(ATTR_CONFIG_ENTRY_ID, entry_id) != entry_id:
+                continue
+
+            # Datasets without enabled entities are not polled, ask the NAS
+            tmp_datasets = await coordinator.async_action(
+                "pool.dataset.query",
+                [
+                    record_filters("name", patterns, []),
+                    {"select": ["name"], "extra": {"retrieve_children": False}},
+                ],
+            )
+            if not isinstance(tmp_datasets, list):
+                _LOGGER.warning(
+                    "TrueNAS %s datasets could not be listed, using polled datasets",
+                    coordinator.host,
+                )
+                tmp_datasets = list(coordinator.data["dataset"].values())
+
+            for dataset in tmp_datasets:
+                if any(fnmatchcase(dataset["name"], pattern) for pattern in patterns):
+                    datasets.setdefault(coordinator, set()).add(dataset["name"])
+
+    return {coordinator: sorted(names) for coordinator, names in datasets.items()}
+
+
+# ---------------------------
+#   _async_snapshot_many
+# ---------------------------
+async def _async_snapshot_many(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Create a custom snapshot on every resolved dataset."""
+    recursive = call.data[SERVICE_SNAPSHOT_RECURSIVE]
+    targets = await _async_get_datasets(hass, call)
+
+    async def async_run(coordinator: TrueNASCoordinator, names: list[str]) -> dict:
+        """Snapshot datasets on one NAS."""
+        if recursive:
+            # Children are covered by a recursive snapshot of their parent
+            names = [
+                name
+                for name in names
+                if not any(name.startswith(f"{parent}/") for parent in names)
+            ]
+
+        ts = datetime.now().isoformat(sep="_", timespec="microseconds")
+        snapshot_name = f"{SNAPSHOT_PREFIX}{ts}"
+        results = await _async_wait_bulk(
+            coordinator,
+            "zfs.snapshot.create",
+            [
+                [{"dataset": name, "name": snapshot_name, "recursive": recursive}]
+                for name in names
+            ],
+            SERVICE_DATASET_SNAPSHOT_MANY,
+        )
+        if results is None:
+            return {"created": [], "failed": dict.fromkeys(names, "job failed")}
+
+        response = {"created": [], "failed": {}}
+        for name, result in zip(names, results):
+            if result.get("error"):
+                response["failed"][name] = result["error"]
+            else:
+                response["created"].append(f"{name}@{snapshot_name}")
+
+        return response
+
+    responses = await asyncio.gather(
+        *(async_run(coordinator, names) for coordinator, names in targets.items())
+    )
+    return {
+        coordinator.host: response for coordinator, response in zip(targets, responses)
+    }
+
+
+# ---------------------------
+#   _async_snapshot_prune
+# ---------------------------
+async def _async_snapshot_prune(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Delete custom snapshots beyond the retention count."""
+    keep = call.data[SERVICE_SNAPSHOT_KEEP]
+    targets = await _async_get_datasets(hass, call)
+
+    async def async_run(coordinator: TrueNASCoordinator, names: list[str]) -> dict:
+        """Prune snapshots on one NAS."""
+        snapshots = await coordinator.async_action(
+            "zfs.snapshot.query",
+            [
+                [
+                    ["dataset", "in", names],
+                    ["snapshot_name", "^", SNAPSHOT_PREFIX],
+                ],
+                {"select": ["name", "dataset", "snapshot_name"]},
+            ],
+        )
+        if not isinstance(snapshots, list):
+            _LOGGER.error("TrueNAS %s snapshots could not be listed", coordinator.host)
+            return {"deleted": [], "failed": {}}
+
+        per_dataset: dict[str, list[dict]] = {}
+        for snapshot in snapshots:
+            per_dataset.setdefault(snapshot["dataset"], []).append(snapshot)
+
+        # Timestamped names sort chronologically, newest first
+        expired = []
+        for dataset_snapshots in per_dataset.values():
+            dataset_snapshots.sort(key=lambda x: x["snapshot_name"], reverse=True)
+            expired.extend(snapshot["name"] for snapshot in dataset_snapshots[keep:])
+
+        response = {"deleted": [], "failed": {}}
+        for i in range(0, len(expired), SNAPSHOT_DELETE_BATCH):
+            batch = expired[i : i + SNAPSHOT_DELETE_BATCH]
+            results = await _async_wait_bulk(
+                coordinator,
+                "zfs.snapshot.delete",
+                [[name] for name in batch],
+                SERVICE_DATASET_SNAPSHOT_PRUNE,
+            )
+            if results is None:
+                response["failed"].update(dict.fromkeys(batch, "job failed"))
+                continue
+
+            for name, result in zip(batch, results):
+                if result.get("error"):
+                    response["failed"][name] = result["error"]
+                else:
+                    response["deleted"].append(name)
+
+        return response
+
+    responses = await asyncio.gather(
+        *(async_run(coordinator, names) for coordinator, names in targets.items())
+    )
+    return {
+        coordinator.host: response for coordinator, response in zip(targets, responses)
+    }
@@ -6,7 +6,8 @@ from logging import getLogger
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from homeassistant.components.update import (
@@ -15,6 +16,8 @@ from homeassistant.components.update import (
     UpdateEntityFeature,
 )
 
+from .apiparser import from_entry
+from .const import UPDATE_TIMEOUT
 from .coordinator import TrueNASCoordinator
 from .entity import TrueNASEntity, async_add_entities
 from .update_types import SENSOR_SERVICES, SENSOR_TYPES
@@ -60,6 +63,8 @@ class TrueNASUpdate(TrueNASEntity, UpdateEntity):
         self._attr_supported_features = UpdateEntityFeature.INSTALL
         self._attr_supported_features |= UpdateEntityFeature.PROGRESS
         self._attr_title = self.entity_description.title
+        # Job state and progress reported by events, kept off the shared record
+        self._job_progress: tuple[str, int] | None = None
 
     @property
     def installed_version(self) -> str:
@@ -76,23 +81,51 @@ class TrueNASUpdate(TrueNASEntity, UpdateEntity):
 
     async def async_install(self, version: str, backup: bool, **kwargs: Any) -> None:
         """Install an update."""
-        self._data["update_jobid"] = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        job_id = await self.coordinator.async_action(
             "update.update",
             {"reboot": True},
         )
+        if isinstance(job_id, int):
+            await self.coordinator.async_set_record_values(
+                "system_info", None, update_jobid=job_id
+            )
+
         await self.coordinator.async_refresh()
+        self.coordinator.async_schedule_burst()
+        if not isinstance(job_id, int):
+            return
+
+        @callback
+        def async_progress(job: dict) -> None:
+            """Show job progress as it is reported."""
+            self._job_progress = (
+                job.get("state", "unknown"),
+                from_entry(job, "progress/percent", 0),
+            )
+            self.async_write_ha_state()
+
+        try:
+            # Returns when the job finishes or the connection drops for the reboot
+            tmp_job = await self.coordinator.async_wait_job(
+                job_id, UPDATE_TIMEOUT, async_progress
+            )
+        finally:
+            self._job_progress = None
+
+        if tmp_job and tmp_job["state"] != "SUCCESS":
+            raise HomeAssistantError(f"TrueNAS update failed: {tmp_job.get('error')}")
 
     @property
     def in_progress(self) -> int:
         """Update installation progress."""
-        if self._data["update_state"] != "RUNNING":
+        state, progress = self._job_progress or (
+            self._data["update_state"],
+            self._data["update_progress"],
+        )
+        if state != "RUNNING":
             return False
 
-        if self._data["update_progress"] == 0:
-            self._data["update_progress"] = 1
-
-        return self._data["update_progress"]
+        return max(progress, 1)
 
 
 # ---------------------------
@@ -133,12 +166,27 @@ class TrueNASAppUpdate(TrueNASEntity, UpdateEntity):
             )
             return
 
-        self._data["update_jobid"] = await self.hass.async_add_executor_job(
-            self.coordinator.api.query,
+        job_id = await self.coordinator.async_action(
             "app.upgrade",
             [self._data["id"]],
         )
-        await self.coordinator.async_refresh()
+        tmp_job = None
+        if isinstance(job_id, int):
+            await self.coordinator.async_set_record_values(
+                "app", self._uid, update_jobid=job_id
+            )
+            self.coordinator.async_schedule_burst()
+            tmp_job = await self.coordinator.async_wait_job(job_id, UPDATE_TIMEOUT)
+            if tmp_job:
+                await self.coordinator.async_set_record_values(
+                    "app", self._uid, update_jobid=0
+                )
+
+        await self.coordinator.async_refresh_record("app", self._uid)
+        if tmp_job and tmp_job["state"] != "SUCCESS":
+            raise HomeAssistantError(
+                f"App {self._data['name']} upgrade failed: {tmp_job.get('error')}"
+            )
 
     @property
     def in_progress(self) -> bool: